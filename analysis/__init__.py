@@ -4,6 +4,7 @@ Crypto-Trust Analysis Package
 Modular graph analytics for Bitcoin OTC trust network analysis.
 """
 
+from .csr import *
 from .centrality import *
 from .community import *
 from .paths import *
@@ -4,34 +4,256 @@ Community Detection Module
 Functions for detecting and analyzing communities in trust networks.
 """
 
-import networkx as nx
-from collections import Counter
+import random
 
-# Try to import community detection libraries with multiple fallbacks
-LOUVAIN_METHOD = None
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from collections import Counter, defaultdict
+from networkx.algorithms.community import louvain_communities
 
+from .csr import CUGRAPH_AVAILABLE, csr_view, cugraph_view
+
+if CUGRAPH_AVAILABLE:
+    import cugraph
+
+# igraph's C Louvain (community_multilevel) replaces the NetworkX one when present
+try:
+    import igraph as ig
+    IGRAPH_AVAILABLE = True
+except ImportError:
+    IGRAPH_AVAILABLE = False
+
+# Numba compiles a CSR Louvain kernel; it beats igraph's (no graph copy to build)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# All Louvain backends apply incremental modularity-gain (delta Q) updates
+# per node move, unlike python-louvain which recomputes modularity
+if NUMBA_AVAILABLE:
+    LOUVAIN_METHOD = 'numba'
+elif IGRAPH_AVAILABLE:
+    LOUVAIN_METHOD = 'igraph'
+else:
+    LOUVAIN_METHOD = 'networkx'
+
+# Leiden (via igraph) supports warm-starting from a previous partition
 try:
-    import community.community_louvain as community_louvain
-    LOUVAIN_METHOD = 'community_louvain'
+    import leidenalg
+    LEIDEN_AVAILABLE = IGRAPH_AVAILABLE
 except ImportError:
-    try:
-        import community as community_louvain
-        LOUVAIN_METHOD = 'community'
-    except ImportError:
-        # Use NetworkX's built-in louvain (available in networkx >= 3.0)
-        try:
-            from networkx.algorithms.community import louvain_communities
-            LOUVAIN_METHOD = 'networkx'
-        except ImportError:
-            LOUVAIN_METHOD = None
+    LEIDEN_AVAILABLE = False
 
 
-def detect_communities(G_trust):
+def _igraph_louvain(G_trust):
+    """
+    Run igraph's multilevel (Louvain) community detection.
+    
+    The igraph graph is built straight from the shared CSR adjacency, with
+    each reciprocal pair collapsed to one undirected edge carrying the
+    larger of its two weights.
+    
+    Args:
+        G_trust: Trust graph (directed or undirected)
+        
+    Returns:
+        dict: {node: community_id}
+    """
+    A, nodes, _ = csr_view(G_trust, weight='weight')
+    upper = sp.triu(A.maximum(A.T), format='coo')
+    
+    g = ig.Graph(n=len(nodes), edges=np.column_stack((upper.row, upper.col)).tolist(),
+                 directed=False, edge_attrs={'weight': upper.data.tolist()})
+    # Seeded like the NetworkX path so reruns give the same partition
+    ig.set_random_number_generator(random.Random(42))
+    membership = g.community_multilevel(weights='weight').membership
+    
+    return dict(zip(nodes, membership))
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _louvain_moves(indptr, indices, weights, degrees, total_weight, resolution, order, max_passes):
+        """One Louvain local-moving phase on a symmetric CSR graph; returns a community per node."""
+        n = degrees.shape[0]
+        community = np.arange(n)
+        community_degree = degrees.copy()
+        link_weight = np.zeros(n)  # weight from the current node into each community
+        touched = np.empty(n, dtype=np.int64)
+        
+        for _ in range(max_passes):
+            moved = False
+            for i in order:
+                k_i = degrees[i]
+                old = community[i]
+                num_touched = 0
+                for k in range(indptr[i], indptr[i + 1]):
+                    j = indices[k]
+                    if j == i:
+                        continue
+                    c = community[j]
+                    if link_weight[c] == 0.0:
+                        touched[num_touched] = c
+                        num_touched += 1
+                    link_weight[c] += weights[k]
+                
+                # delta Q (scaled by m) of joining c once i is taken out of its community
+                community_degree[old] -= k_i
+                best = old
+                best_gain = link_weight[old] - resolution * community_degree[old] * k_i / total_weight
+                for t in range(num_touched):
+                    c = touched[t]
+                    gain = link_weight[c] - resolution * community_degree[c] * k_i / total_weight
+                    if gain > best_gain + 1e-12:
+                        best = c
+                        best_gain = gain
+                community_degree[best] += k_i
+                if best != old:
+                    community[i] = best
+                    moved = True
+                
+                for t in range(num_touched):
+                    link_weight[touched[t]] = 0.0
+            if not moved:
+                break
+        
+        return community
+
+
+def _numba_louvain(G_trust, resolution=1.0, seed=42, max_passes=100):
+    """
+    Run Louvain with the Numba kernel, aggregating communities between levels.
+    
+    Reciprocal pairs collapse to one undirected edge carrying the larger of
+    their two weights, as in the igraph path. Nodes are visited in a seeded
+    random order, so reruns give the same partition.
+    
+    Args:
+        G_trust: Trust graph (directed or undirected)
+        resolution: Modularity resolution
+        seed: Seed for the node visiting order
+        max_passes: Cap on local-moving sweeps per level
+        
+    Returns:
+        dict: {node: community_id}
+    """
+    A, nodes, _ = csr_view(G_trust, weight='weight')
+    W = A.maximum(A.T).tocsr()
+    total_weight = W.sum()
+    membership = np.arange(len(nodes))
+    if total_weight == 0:
+        return dict(zip(nodes, membership.tolist()))
+    
+    rng = np.random.default_rng(seed)
+    while True:
+        degrees = np.asarray(W.sum(axis=1)).ravel()
+        community = _louvain_moves(W.indptr, W.indices, W.data.astype(float), degrees, total_weight,
+                                   resolution, rng.permutation(W.shape[0]), max_passes)
+        labels, community = np.unique(community, return_inverse=True)
+        if len(labels) == W.shape[0]:
+            break  # no merges at this level
+        membership = community[membership]
+        
+        # Aggregate: one node per community, internal weight on the diagonal
+        C = sp.csr_array((np.ones(len(community)), (np.arange(len(community)), community)),
+                         shape=(len(community), len(labels)))
+        W = (C.T @ W @ C).tocsr()
+    
+    return dict(zip(nodes, membership.tolist()))
+
+
+def _leiden_update(G_undirected, previous_partition):
+    """
+    Refine a previous partition with Leiden, keeping known nodes fixed.
+    
+    Nodes present in previous_partition keep their community; only new
+    nodes are placed, starting as singletons.
+    
+    Args:
+        G_undirected: Undirected trust graph
+        previous_partition: Partition dict from an earlier run
+        
+    Returns:
+        dict: {node: community_id}
+    """
+    g = ig.Graph.from_networkx(G_undirected)
+    names = g.vs['_nx_name']
+    
+    # leidenalg needs dense labels below the node count, so only communities
+    # that still have a node in the graph get one
+    old_ids = sorted({previous_partition[node] for node in names if node in previous_partition})
+    dense = {comm_id: i for i, comm_id in enumerate(old_ids)}
+    membership = []
+    fixed = []
+    next_label = len(old_ids)
+    for node in names:
+        if node in previous_partition:
+            membership.append(dense[previous_partition[node]])
+            fixed.append(True)
+        else:
+            membership.append(next_label)
+            fixed.append(False)
+            next_label += 1
+    
+    # leidenalg only accepts float weights (rating weights are ints); edges
+    # without one count as 1, as in NetworkX
+    weights = None
+    if 'weight' in g.es.attributes():
+        weights = [1.0 if w is None else float(w) for w in g.es['weight']]
+    leiden = leidenalg.ModularityVertexPartition(g, initial_membership=membership, weights=weights)
+    optimiser = leidenalg.Optimiser()
+    optimiser.set_rng_seed(42)
+    optimiser.optimise_partition(leiden, is_membership_fixed=fixed)
+    
+    # Map result labels back through the fixed nodes (leidenalg may renumber);
+    # new communities get IDs after every previous one, including vanished ones
+    label_to_id = {
+        label: previous_partition[node]
+        for node, label, is_fixed in zip(names, leiden.membership, fixed) if is_fixed
+    }
+    next_id = max(previous_partition.values(), default=-1) + 1
+    partition = {}
+    for node, label in zip(names, leiden.membership):
+        if label not in label_to_id:
+            label_to_id[label] = next_id
+            next_id += 1
+        partition[node] = label_to_id[label]
+    
+    return partition
+
+
+def _cugraph_louvain(G_trust):
+    """Run cuGraph's GPU Louvain; returns {node: community_id}."""
+    G_gpu, nodes = cugraph_view(G_trust, weight='weight', directed=False)
+    parts, _ = cugraph.louvain(G_gpu)
+    parts = parts.to_pandas()
+    
+    membership = np.zeros(len(nodes), dtype=np.int64)
+    membership[parts['vertex'].to_numpy()] = parts['partition'].to_numpy()
+    
+    return dict(zip(nodes, membership.tolist()))
+
+
+def detect_communities(G_trust, previous_partition=None, use_gpu=False):
     """
     Detect communities using Louvain algorithm.
 
+    Uses cuGraph on the GPU when use_gpu is set and cuGraph is installed,
+    then the Numba kernel or igraph's C implementation when installed,
+    NetworkX's otherwise.
+
+    When a previous partition is given and leidenalg is installed, the
+    partition is updated incrementally with Leiden instead of re-clustering
+    the whole graph: previously seen nodes keep their community and only
+    new nodes are assigned.
+
     Args:
         G_trust: Trust subgraph (undirected or will be converted)
+        previous_partition: Partition dict from an earlier run (optional)
+        use_gpu: Use cuGraph when available (ignored for incremental updates)
 
     Returns:
         tuple: (partition dict, community_sizes Counter)
@@ -39,30 +261,28 @@ def detect_communities(G_trust):
     if G_trust.number_of_nodes() == 0:
         return {}, Counter()
 
-    # Convert to undirected for Louvain
+    if not (previous_partition and LEIDEN_AVAILABLE):
+        if use_gpu and CUGRAPH_AVAILABLE:
+            partition = _cugraph_louvain(G_trust)
+            return partition, Counter(partition.values())
+        if NUMBA_AVAILABLE:
+            partition = _numba_louvain(G_trust)
+            return partition, Counter(partition.values())
+        if IGRAPH_AVAILABLE:
+            partition = _igraph_louvain(G_trust)
+            return partition, Counter(partition.values())
+
+    # Convert to undirected for Louvain (a read-only view, no edge copies)
     if G_trust.is_directed():
-        G_undirected = G_trust.to_undirected()
+        G_undirected = G_trust.to_undirected(as_view=True)
     else:
         G_undirected = G_trust
 
-    # Use the appropriate method based on what's available
-    if LOUVAIN_METHOD == 'community_louvain' or LOUVAIN_METHOD == 'community':
-        partition = community_louvain.best_partition(G_undirected, weight='weight')
-    elif LOUVAIN_METHOD == 'networkx':
-        # NetworkX returns list of sets, convert to partition dict
-        communities = louvain_communities(G_undirected, weight='weight', seed=42)
-        partition = {}
-        for comm_id, comm_nodes in enumerate(communities):
-            for node in comm_nodes:
-                partition[node] = comm_id
+    if previous_partition and LEIDEN_AVAILABLE:
+        partition = _leiden_update(G_undirected, previous_partition)
     else:
-        # Fallback: use greedy modularity communities
-        from networkx.algorithms.community import greedy_modularity_communities
-        communities = list(greedy_modularity_communities(G_undirected, weight='weight'))
-        partition = {}
-        for comm_id, comm_nodes in enumerate(communities):
-            for node in comm_nodes:
-                partition[node] = comm_id
+        communities = louvain_communities(G_undirected, weight='weight', resolution=1.0, seed=42)
+        partition = {node: comm_id for comm_id, comm_nodes in enumerate(communities) for node in comm_nodes}
 
     community_sizes = Counter(partition.values())
 
@@ -85,31 +305,32 @@ def find_suspicious_communities(G_trust, partition, community_sizes, max_size=10
     if G_trust.number_of_nodes() == 0:
         return []
     
-    # Get undirected version
-    if G_trust.is_directed():
-        G_undirected = G_trust.to_undirected()
-    else:
-        G_undirected = G_trust
+    # Work on the CSR arrays: symmetrise so links count in either direction
+    A, _, node_index = csr_view(G_trust)
+    A_undirected = (A + A.T).tocsr()
+    
+    # Largest connected component (lowest label wins ties, like the first
+    # component NetworkX yields in node order)
+    _, labels = connected_components(A_undirected, directed=False)
+    in_main = labels == np.bincount(labels).argmax()
+    # Nodes with at least one neighbour in the main component
+    touches_main = (A_undirected @ in_main.astype(float)) > 0
     
-    # Find largest connected component
-    largest_cc = max(nx.connected_components(G_undirected), key=len)
+    # Invert the partition once instead of scanning it per community
+    members = defaultdict(list)
+    for user, c in partition.items():
+        members[c].append(user)
     
     suspicious = []
     for comm_id, size in community_sizes.items():
         if size < max_size:
             # Get users in this community
-            comm_users = [user for user, c in partition.items() if c == comm_id]
+            comm_users = members[comm_id]
             
             # Check if isolated from main component
-            connections_to_main = 0
-            for user in comm_users:
-                if user in G_undirected:
-                    neighbors = set(G_undirected.neighbors(user))
-                    if neighbors & largest_cc:
-                        connections_to_main += 1
-                        break
+            rows = [node_index[user] for user in comm_users if user in node_index]
             
-            if connections_to_main == 0:
+            if not touches_main[rows].any():
                 suspicious.append({
                     'Community ID': comm_id,
                     'Size': size,
@@ -140,18 +361,31 @@ def analyze_community_structure(partition, community_sizes):
         }
     
     sizes = list(community_sizes.values())
+    total = sum(sizes)
+    
+    # Bucket sizes in one pass
+    singletons = small = medium = large = 0
+    for size in sizes:
+        if size == 1:
+            singletons += 1
+        elif size <= 10:
+            small += 1
+        elif size <= 50:
+            medium += 1
+        else:
+            large += 1
     
     return {
         'total_communities': len(community_sizes),
         'largest_community_size': max(sizes),
         'smallest_community_size': min(sizes),
-        'average_community_size': sum(sizes) / len(sizes),
-        'total_nodes': sum(sizes),
+        'average_community_size': total / len(sizes),
+        'total_nodes': total,
         'size_distribution': {
-            '1 node': sum(1 for s in sizes if s == 1),
-            '2-10 nodes': sum(1 for s in sizes if 2 <= s <= 10),
-            '11-50 nodes': sum(1 for s in sizes if 11 <= s <= 50),
-            '50+ nodes': sum(1 for s in sizes if s > 50)
+            '1 node': singletons,
+            '2-10 nodes': small,
+            '11-50 nodes': medium,
+            '50+ nodes': large
         }
     }
 
@@ -181,8 +415,13 @@ def get_intercommunity_edges(G, partition):
     Returns:
         int: Number of edges between communities
     """
-    inter_edges = 0
-    for u, v in G.edges():
-        if partition.get(u) != partition.get(v):
-            inter_edges += 1
-    return inter_edges
+    if G.number_of_edges() == 0:
+        return 0
+    
+    A, nodes, _ = csr_view(G)
+    # Nodes missing from the partition share the -1 label, as partition.get() did
+    part_arr = np.fromiter((partition.get(n, -1) for n in nodes), dtype=np.int64, count=len(nodes))
+    
+    A = sp.triu(A, format='coo') if not G.is_directed() else A.tocoo()  # count undirected edges once
+    
+    return int(np.count_nonzero(part_arr[A.row] != part_arr[A.col]))
@@ -6,6 +6,13 @@ Functions for analyzing connected components and network structure.
 
 import networkx as nx
 
+# NetworKit provides a C++ biconnected-components pass; fall back to NetworkX without it
+try:
+    import networkit as nk
+    NETWORKIT_AVAILABLE = True
+except ImportError:
+    NETWORKIT_AVAILABLE = False
+
 
 def analyze_components(G):
     """
@@ -34,8 +41,17 @@ def analyze_components(G):
     largest_size = component_sizes[0] if component_sizes else 0
     num_nodes = G.number_of_nodes()
     
-    # Count isolated nodes (components of size 1)
-    isolated = sum(1 for size in component_sizes if size == 1)
+    # Bucket sizes in one pass; size-1 components are the isolated nodes
+    isolated = small = medium = large = 0
+    for size in component_sizes:
+        if size == 1:
+            isolated += 1
+        elif size <= 10:
+            small += 1
+        elif size <= 100:
+            medium += 1
+        else:
+            large += 1
     
     return {
         'num_components': len(components),
@@ -44,10 +60,10 @@ def analyze_components(G):
         'num_isolated_nodes': isolated,
         'component_sizes': component_sizes,
         'size_distribution': {
-            '1 node': sum(1 for s in component_sizes if s == 1),
-            '2-10 nodes': sum(1 for s in component_sizes if 2 <= s <= 10),
-            '11-100 nodes': sum(1 for s in component_sizes if 11 <= s <= 100),
-            '100+ nodes': sum(1 for s in component_sizes if s > 100)
+            '1 node': isolated,
+            '2-10 nodes': small,
+            '11-100 nodes': medium,
+            '100+ nodes': large
         }
     }
 
@@ -164,5 +180,16 @@ def find_bridge_nodes(G):
     else:
         G_und = G
     
-    bridges = list(nx.articulation_points(G_und))
-    return bridges
+    # nx2nk cannot convert a graph without nodes
+    if G_und.number_of_nodes() == 0:
+        return []
+    
+    if not NETWORKIT_AVAILABLE:
+        return list(nx.articulation_points(G_und))
+    
+    # Articulation points are the nodes shared by more than one biconnected component
+    nodes = list(G_und)
+    nk_G = nk.nxadapter.nx2nk(G_und)  # keep a reference: the algorithm does not own it
+    bcc = nk.components.BiconnectedComponents(nk_G)
+    bcc.run()
+    return [node for i, node in enumerate(nodes) if len(bcc.getComponentsOfNode(i)) > 1]
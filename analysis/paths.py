@@ -5,6 +5,10 @@ Functions for analyzing trust paths and risk assessment.
 """
 
 import networkx as nx
+import numpy as np
+
+# Risk levels ordered from best to worst
+RISK_LEVELS = ('LOW', 'MEDIUM', 'ELEVATED', 'HIGH')
 
 
 def find_shortest_path(G, source, target):
@@ -23,6 +27,7 @@ def find_shortest_path(G, source, target):
             'length': int hops,
             'total_trust': float,
             'average_trust': float,
+            'ratings': list of edge ratings along the path,
             'error': str or None
         }
     """
@@ -31,7 +36,9 @@ def find_shortest_path(G, source, target):
         path_length = len(path) - 1
         
         # Calculate trust score along path
-        total_trust = sum(G[path[i]][path[i+1]]['rating'] for i in range(len(path)-1))
+        adj = G.adj
+        ratings = [adj[u][v]['rating'] for u, v in zip(path, path[1:])]
+        total_trust = sum(ratings)
         avg_trust = total_trust / path_length if path_length > 0 else 0
         
         return {
@@ -40,6 +47,7 @@ def find_shortest_path(G, source, target):
             'length': path_length,
             'total_trust': total_trust,
             'average_trust': avg_trust,
+            'ratings': ratings,
             'error': None
         }
     
@@ -50,6 +58,7 @@ def find_shortest_path(G, source, target):
             'length': 0,
             'total_trust': 0,
             'average_trust': 0,
+            'ratings': [],
             'error': 'No path exists'
         }
     
@@ -60,6 +69,7 @@ def find_shortest_path(G, source, target):
             'length': 0,
             'total_trust': 0,
             'average_trust': 0,
+            'ratings': [],
             'error': f'Node not found: {e}'
         }
 
@@ -81,39 +91,24 @@ def assess_path_risk(path_info):
     avg_trust = path_info['average_trust']
     
     # Risk based on path length
-    if length <= 2:
-        length_risk = 'LOW'
-    elif length <= 4:
-        length_risk = 'MEDIUM'
-    else:
-        length_risk = 'ELEVATED'
+    length_risk = 0 if length <= 2 else 1 if length <= 4 else 2
     
     # Risk based on trust quality
-    if avg_trust >= 8:
-        trust_risk = 'LOW'
-    elif avg_trust >= 5:
-        trust_risk = 'MEDIUM'
-    else:
-        trust_risk = 'ELEVATED'
+    trust_risk = 0 if avg_trust >= 8 else 1 if avg_trust >= 5 else 2
     
     # Combined risk (take worse of the two)
-    risks = {'LOW': 0, 'MEDIUM': 1, 'ELEVATED': 2, 'HIGH': 3}
-    combined_score = max(risks[length_risk], risks[trust_risk])
-    
-    for level, score in risks.items():
-        if score == combined_score:
-            return level
-    
-    return 'MEDIUM'
+    return RISK_LEVELS[max(length_risk, trust_risk)]
 
 
-def analyze_path_quality(G, path):
+def analyze_path_quality(G, path, ratings=None):
     """
     Analyze quality metrics for a given path.
     
     Args:
         G: NetworkX graph
         path: List of nodes in path
+        ratings: Edge ratings along path (e.g. from find_shortest_path()),
+            read from G when omitted
         
     Returns:
         dict: Quality metrics
@@ -121,10 +116,9 @@ def analyze_path_quality(G, path):
     if len(path) < 2:
         return {'valid': False}
     
-    ratings = []
-    for i in range(len(path) - 1):
-        rating = G[path[i]][path[i+1]].get('rating', 0)
-        ratings.append(rating)
+    if ratings is None:
+        adj = G.adj
+        ratings = [adj[u][v].get('rating', 0) for u, v in zip(path, path[1:])]
     
     return {
         'valid': True,
@@ -137,35 +131,41 @@ def analyze_path_quality(G, path):
     }
 
 
-def compute_average_path_length(G, sample_size=100):
+def compute_average_path_length(G, sample_size=100, seed=None):
     """
     Compute average shortest path length on a sample of node pairs.
     
     Args:
         G: NetworkX graph
         sample_size: Number of random pairs to sample
+        seed: Seed for the random generator (None for nondeterministic)
         
     Returns:
         float: Average path length
     """
-    import random
-    
     if G.number_of_nodes() < 2:
         return 0
     
-    nodes = list(G.nodes())
-    paths_found = []
+    # Draw all pairs in one vectorized call rather than per iteration
+    nodes = list(G)
+    rng = np.random.default_rng(seed)
+    source_idx = rng.integers(0, len(nodes), sample_size)
+    target_idx = rng.integers(0, len(nodes), sample_size)
+    distinct = source_idx != target_idx
     
-    for _ in range(sample_size):
-        source = random.choice(nodes)
-        target = random.choice(nodes)
-        
-        if source != target:
-            try:
-                length = nx.shortest_path_length(G, source, target)
-                paths_found.append(length)
-            except nx.NetworkXNoPath:
-                continue
+    # Index the plain list: a NumPy object array would split tuple node ids
+    sources = [nodes[i] for i in source_idx[distinct].tolist()]
+    targets = [nodes[i] for i in target_idx[distinct].tolist()]
+    
+    paths_found = []
+    for source, target in zip(sources, targets):
+        try:
+            # Bidirectional BFS stops as soon as the two frontiers meet,
+            # which is far cheaper than a full BFS per sampled source
+            length = nx.shortest_path_length(G, source, target)
+            paths_found.append(length)
+        except nx.NetworkXNoPath:
+            continue
     
     if paths_found:
         return sum(paths_found) / len(paths_found)
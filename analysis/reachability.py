@@ -4,8 +4,64 @@ Reachability Analysis Module
 Functions for BFS-based reachability and trust radius analysis.
 """
 
-import networkx as nx
+from concurrent.futures import ThreadPoolExecutor
+from heapq import nlargest
+from operator import itemgetter
+
+import numpy as np
 import pandas as pd
+from scipy.sparse.csgraph import dijkstra
+
+from .csr import csr_view
+
+# Numba compiles the CSR BFS kernel; fall back to NetworkX traversal without it
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, nogil=True)
+    def _bfs_hop_counts(indptr, indices, source, max_hops):
+        """Count nodes first reached at each hop (index 0 unused) on a CSR graph."""
+        n = indptr.shape[0] - 1
+        dist = np.full(n, -1, dtype=np.int32)
+        queue = np.empty(n, dtype=np.int32)
+        counts = np.zeros(max_hops + 1, dtype=np.int64)
+        
+        dist[source] = 0
+        queue[0] = source
+        head, tail = 0, 1
+        while head < tail:
+            u = queue[head]
+            head += 1
+            d = dist[u]
+            if d == max_hops:
+                continue
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                if dist[v] < 0:
+                    dist[v] = d + 1
+                    counts[d + 1] += 1
+                    queue[tail] = v
+                    tail += 1
+        return counts
+
+
+def _hop_distances(G, source, max_depth):
+    """
+    Hop distance from source to every node, up to max_depth.
+    
+    Runs scipy's depth-limited C search over the cached CSR adjacency;
+    nodes further than max_depth (or unreachable) get inf.
+    
+    Returns:
+        tuple: (nodes, distances array in `nodes` order)
+    """
+    A, nodes, node_index = csr_view(G)
+    return nodes, dijkstra(A, indices=node_index[source], unweighted=True, limit=max_depth)
 
 
 def bfs_reachability(G, source, max_depth=3):
@@ -23,20 +79,18 @@ def bfs_reachability(G, source, max_depth=3):
     if source not in G:
         return {}
     
-    # BFS tree from source
-    bfs_tree = nx.bfs_tree(G, source, depth_limit=max_depth)
-    
     # Organize nodes by depth
     depths = {}
     for depth in range(max_depth + 1):
         depths[depth] = []
     
     # Get distances from source
-    distances = nx.single_source_shortest_path_length(G, source, cutoff=max_depth)
+    nodes, distances = _hop_distances(G, source, max_depth)
+    reached = np.flatnonzero(distances <= max_depth)
     
-    for node, dist in distances.items():
-        if node != source:  # Exclude source itself
-            depths[dist].append(node)
+    for i, dist in zip(reached.tolist(), distances[reached].astype(int).tolist()):
+        if dist > 0:  # Exclude source itself
+            depths[dist].append(nodes[i])
     
     return depths
 
@@ -45,6 +99,8 @@ def compute_trust_radius(G_trust, user, max_hops=3):
     """
     Compute trust radius - how many users are reachable at different hop distances.
     
+    With Numba installed the BFS runs as a compiled kernel over CSR arrays.
+    
     Args:
         G_trust: Trust graph
         user: User node
@@ -58,14 +114,19 @@ def compute_trust_radius(G_trust, user, max_hops=3):
             'total_reachable': int
         }
     """
-    depths = bfs_reachability(G_trust, user, max_depth=max_hops)
+    if NUMBA_AVAILABLE and user in G_trust:
+        A, _, node_index = csr_view(G_trust)
+        counts = _bfs_hop_counts(A.indptr, A.indices, node_index[user], max_hops).tolist()
+    else:
+        depths = bfs_reachability(G_trust, user, max_depth=max_hops)
+        counts = [len(depths.get(hop, [])) for hop in range(max_hops + 1)]
     
     reachable_at_hop = {}
     cumulative = {}
     total = 0
     
     for hop in range(1, max_hops + 1):
-        reachable_at_hop[hop] = len(depths.get(hop, []))
+        reachable_at_hop[hop] = counts[hop]
         total += reachable_at_hop[hop]
         cumulative[hop] = total
     
@@ -91,8 +152,7 @@ def analyze_network_reach(G_trust, sample_users=None, max_hops=3):
     """
     if sample_users is None:
         # Sample top nodes by degree
-        degrees = dict(G_trust.degree())
-        sample_users = sorted(degrees, key=degrees.get, reverse=True)[:20]
+        sample_users = [node for node, _ in nlargest(20, G_trust.degree(), key=itemgetter(1))]
     
     results = []
     for user in sample_users:
@@ -110,27 +170,33 @@ def analyze_network_reach(G_trust, sample_users=None, max_hops=3):
     return pd.DataFrame(results)
 
 
-def compute_average_reachability(G, sample_size=100):
+def compute_average_reachability(G, sample_size=100, seed=None, n_jobs=None):
     """
     Compute average reachability across random nodes.
     
     Args:
         G: NetworkX graph
         sample_size: Number of nodes to sample
+        seed: Seed for the random generator (None for nondeterministic)
+        n_jobs: Worker threads for the compiled BFS (None for executor default)
         
     Returns:
         dict: Average reachability metrics
     """
-    import random
-    import numpy as np
-    
     nodes = list(G.nodes())
-    sample = random.sample(nodes, min(sample_size, len(nodes)))
+    rng = np.random.default_rng(seed)
+    sample = [nodes[i] for i in rng.choice(len(nodes), size=min(sample_size, len(nodes)), replace=False)]
+    
+    def total_reach(node):
+        return compute_trust_radius(G, node, max_hops=3)['total_reachable']
     
-    reachabilities = []
-    for node in sample:
-        radius = compute_trust_radius(G, node, max_hops=3)
-        reachabilities.append(radius['total_reachable'])
+    if NUMBA_AVAILABLE and len(G):
+        csr_view(G)  # build the shared adjacency before the workers start
+        # The compiled BFS releases the GIL, so sampled sources run in parallel
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            reachabilities = list(pool.map(total_reach, sample))
+    else:
+        reachabilities = [total_reach(node) for node in sample]
     
     return {
         'mean_reachability': np.mean(reachabilities),
@@ -156,20 +222,21 @@ def get_unreachable_nodes(G, source, max_depth=3):
     if source not in G:
         return set(G.nodes())
     
-    # Get all reachable nodes
-    reachable = set(nx.single_source_shortest_path_length(G, source, cutoff=max_depth).keys())
-    
-    # All nodes minus reachable
-    all_nodes = set(G.nodes())
-    unreachable = all_nodes - reachable
+    # Nodes beyond max_depth (or never reached) have infinite distance
+    nodes, distances = _hop_distances(G, source, max_depth)
     
-    return unreachable
+    return {nodes[i] for i in np.flatnonzero(distances > max_depth).tolist()}
 
 
 def analyze_trust_propagation(G_trust, top_anchors, max_hops=3):
     """
     Analyze how trust propagates from top anchor nodes.
     
+    A node counts at a hop if some anchor reaches it at exactly that
+    distance, so it can appear under several hops. Anchors only count
+    towards coverage when another anchor reaches them. All anchors are
+    searched in one depth-limited scipy call over the cached CSR adjacency.
+    
     Args:
         G_trust: Trust graph
         top_anchors: List of high-trust nodes
@@ -178,24 +245,25 @@ def analyze_trust_propagation(G_trust, top_anchors, max_hops=3):
     Returns:
         dict: Trust propagation analysis
     """
-    covered_nodes = set()
-    hop_coverage = {hop: set() for hop in range(1, max_hops + 1)}
+    hop_coverage = {hop: 0 for hop in range(1, max_hops + 1)}
+    covered = 0
     
-    for anchor in top_anchors:
-        if anchor in G_trust:
-            depths = bfs_reachability(G_trust, anchor, max_depth=max_hops)
-            
-            for hop, nodes in depths.items():
-                if hop > 0:
-                    hop_coverage[hop].update(nodes)
-                    covered_nodes.update(nodes)
+    anchors = [anchor for anchor in top_anchors if anchor in G_trust]
+    if anchors:
+        A, _, node_index = csr_view(G_trust)
+        # One row of hop distances per anchor (inf beyond max_hops)
+        distances = dijkstra(A, indices=[node_index[anchor] for anchor in anchors],
+                             unweighted=True, limit=max_hops)
+        for hop in hop_coverage:
+            hop_coverage[hop] = int(np.count_nonzero((distances == hop).any(axis=0)))
+        covered = int(np.count_nonzero(((distances >= 1) & (distances <= max_hops)).any(axis=0)))
     
     total_nodes = G_trust.number_of_nodes()
     
     return {
         'anchors_analyzed': len(top_anchors),
-        'total_coverage': len(covered_nodes),
-        'coverage_pct': (len(covered_nodes) / total_nodes * 100) if total_nodes > 0 else 0,
-        'hop_coverage': {hop: len(nodes) for hop, nodes in hop_coverage.items()},
-        'uncovered': total_nodes - len(covered_nodes)
+        'total_coverage': covered,
+        'coverage_pct': (covered / total_nodes * 100) if total_nodes > 0 else 0,
+        'hop_coverage': hop_coverage,
+        'uncovered': total_nodes - covered
     }
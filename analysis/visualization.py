@@ -5,15 +5,25 @@ Functions for creating network visualizations (PNG, interactive, charts).
 Enhanced with better readability, proper scaling, clustering, and color coding.
 """
 
+import json
+import re
+from collections import Counter
+from functools import lru_cache
+from heapq import nlargest, nsmallest
+from itertools import accumulate, chain, islice
+
 import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
-import plotly.express as px
+from matplotlib.collections import LineCollection
+from matplotlib.colors import ListedColormap, to_rgba
 import plotly.graph_objects as go
-import pandas as pd
-from pyvis.network import Network
-import tempfile
-import os
 import random
+import scipy.sparse as sp
+from scipy.optimize import minimize
+
+from .centrality import get_top_nodes
+from .csr import csr_view
 
 
 # Color palettes for consistent styling
@@ -30,6 +40,9 @@ COMMUNITY_COLORS = [
     '#98d8c8',  # Teal
 ]
 
+# COMMUNITY_COLORS as a colormap, for scatter plots colored by palette index
+COMMUNITY_CMAP = ListedColormap(COMMUNITY_COLORS, name='community')
+
 RISK_COLORS = {
     'LOW': '#00ff88',
     'MEDIUM': '#ffd93d',
@@ -37,8 +50,281 @@ RISK_COLORS = {
     'HIGH': '#ff4444'
 }
 
+# Standalone vis.js page (same vis-network build PyVis 0.3 links to)
+_VIS_TEMPLATE = """<html>
+<head>
+    <meta charset="utf-8">
+    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/dist/vis-network.min.css" integrity="sha512-WgxfT5LWjfszlPHXRmBWHkV2eceiWTOBvrKCNbdgDYTHrT2AeLCGbF4sZlZw3UMN3WtL0tGUoIAKsu8mllg/XA==" crossorigin="anonymous" referrerpolicy="no-referrer" />
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/vis-network.min.js" integrity="sha512-LnvoEWDFrqGHlHmDD2101OrLcbsfkrzoSpvtSQtxK3RMnRV0eOkhhBN2dXHKRrUU8p2DGRTk35n4O8nWSVe1mQ==" crossorigin="anonymous" referrerpolicy="no-referrer"></script>
+    <style type="text/css">
+        #mynetwork {
+            width: __WIDTH__;
+            height: __HEIGHT__;
+            background-color: __BGCOLOR__;
+            border: 1px solid lightgray;
+            position: relative;
+            float: left;
+        }
+    </style>
+</head>
+<body>
+    <div id="mynetwork"></div>
+    <script type="text/javascript">
+        var nodes = new vis.DataSet(__NODES__);
+        var edges = new vis.DataSet(__EDGES__);
+        var container = document.getElementById('mynetwork');
+        var network = new vis.Network(container, {nodes: nodes, edges: edges}, __OPTIONS__);
+    </script>
+</body>
+</html>
+"""
+
+# Template split once at import: odd entries are placeholder names, even entries literal text
+_VIS_TEMPLATE_PARTS = re.split(r'__(WIDTH|HEIGHT|BGCOLOR|OPTIONS|NODES|EDGES)__', _VIS_TEMPLATE)
+
+# Compact separators: the node/edge JSON is most of the page sent to the browser
+_JSON_SEPARATORS = (',', ':')
+
+
+def _barnes_hut_options(gravity, central_gravity=0.3, spring_length=250, spring_strength=0.001,
+                        damping=0.09, overlap=0):
+    """Build vis.js options matching PyVis's Network.barnes_hut() on a dark background."""
+    return {
+        'nodes': {'shape': 'dot', 'font': {'color': '#ffffff'}},
+        'edges': {'color': {'inherit': True}, 'smooth': {'enabled': True, 'type': 'dynamic'}},
+        'interaction': {'dragNodes': True, 'hideEdgesOnDrag': False, 'hideNodesOnDrag': False},
+        'physics': {
+            'enabled': True,
+            'barnesHut': {
+                'gravitationalConstant': gravity,
+                'centralGravity': central_gravity,
+                'springLength': spring_length,
+                'springConstant': spring_strength,
+                'damping': damping,
+                'avoidOverlap': overlap
+            },
+            'stabilization': {
+                'enabled': True,
+                'fit': True,
+                'iterations': 1000,
+                'onlyDynamicEdges': False,
+                'updateInterval': 50
+            }
+        }
+    }
+
+
+# Serialized once at import: each view's physics never changes between calls
+_VIS_OPTIONS_JSON = {
+    'interactive': json.dumps(_barnes_hut_options(gravity=-3000, central_gravity=0.3, spring_length=150, spring_strength=0.01)),
+    'centrality': json.dumps(_barnes_hut_options(gravity=-2000, central_gravity=0.5, spring_length=200, spring_strength=0.01)),
+    'community': json.dumps(_barnes_hut_options(gravity=-1500, central_gravity=0.2, spring_length=120)),
+    'path': json.dumps(_barnes_hut_options(gravity=-1500, central_gravity=0.3, spring_length=150)),
+    'component': json.dumps(_barnes_hut_options(gravity=-2000, central_gravity=0.3, spring_length=100)),
+    'suspicious': json.dumps(_barnes_hut_options(gravity=-500, central_gravity=0.8, spring_length=80)),
+    'reachability': json.dumps(_barnes_hut_options(gravity=-1500, central_gravity=0.5, spring_length=100)),
+}
+
+
+def _render_vis_html(nodes, edges, options_json, width='100%', height='600px', bgcolor='#1a1a2e'):
+    """
+    Render vis.js node and edge dicts as a standalone HTML page.
+
+    Args:
+        nodes: List of vis.js node dicts (must have 'id')
+        edges: List of vis.js edge dicts (must have 'from' and 'to')
+        options_json: vis.js network options, already JSON-encoded
+        width, height: CSS size of the canvas
+        bgcolor: Canvas background color
+
+    Returns:
+        str: HTML document
+    """
+    # Networks are drawn undirected: keep the first edge of each node pair, like PyVis
+    seen_pairs = set()
+    unique_edges = []
+    for edge in edges:
+        pair = frozenset((edge['from'], edge['to']))
+        if pair not in seen_pairs:
+            seen_pairs.add(pair)
+            unique_edges.append(edge)
+
+    fields = {
+        'WIDTH': width,
+        'HEIGHT': height,
+        'BGCOLOR': bgcolor,
+        'OPTIONS': options_json,
+        'NODES': json.dumps(nodes, separators=_JSON_SEPARATORS),
+        'EDGES': json.dumps(unique_edges, separators=_JSON_SEPARATORS),
+    }
+    # One join instead of a chain of replace() calls, each copying the whole page
+    return ''.join(fields[part] if i % 2 else part for i, part in enumerate(_VIS_TEMPLATE_PARTS))
+
+
+def _induced_edges(G, nodes, weight=None):
+    """
+    Edges of the subgraph induced by `nodes`, sliced from the shared CSR.
+
+    Rows follow G's node order, so reciprocal pairs resolve the same way
+    as iterating the graph itself. Nodes not in G are ignored.
+
+    Args:
+        G: NetworkX graph
+        nodes: Iterable of nodes to keep
+        weight: Edge attribute to return as the third item (integer-valued,
+            like 'rating'), or None for plain (u, v) pairs
+
+    Returns:
+        list: (u, v) or (u, v, weight) tuples
+    """
+    if not len(G):
+        return []
+    A, order, node_index = csr_view(G, weight=weight)
+    idx = np.unique(np.fromiter((node_index[n] for n in nodes if n in node_index), dtype=np.int64))
+    sub = A[idx][:, idx].tocoo()
+    us = [order[i] for i in idx[sub.row].tolist()]
+    vs = [order[i] for i in idx[sub.col].tolist()]
+    if weight is None:
+        return list(zip(us, vs))
+    return list(zip(us, vs, sub.data.astype(np.int64).tolist()))
+
+
+def _fr_energy_grad(x, n, row, col, incidence, k, gravity=1.0):
+    """
+    Fruchterman-Reingold energy and its gradient for a flattened layout.
 
-def create_network_png(G, pagerank_scores, partition, output_path='network_viz.png', sample_size=300):
+    Edges attract with energy |d|^3 / 3k, every pair repels with -k^2 ln|d|,
+    and a weak pull towards the origin keeps disconnected pieces in frame.
+    `incidence` is the sparse (n, E) node-edge matrix (+1 at row, -1 at col)
+    that scatters edge forces back onto nodes.
+    """
+    pos = x.reshape(n, 2)
+
+    # Pairwise repulsion (dense: the PNG sample is a few hundred nodes)
+    sq = np.einsum('ij,ij->i', pos, pos)
+    dist2 = sq[:, None] + sq[None, :] - 2 * (pos @ pos.T)
+    np.fill_diagonal(dist2, 1.0)
+    np.maximum(dist2, 1e-9, out=dist2)
+    energy = -0.25 * k * k * np.log(dist2).sum()  # each pair counted twice
+    inv = 1.0 / dist2
+    np.fill_diagonal(inv, 0.0)
+    grad = -k * k * (pos * inv.sum(axis=1)[:, None] - inv @ pos)
+
+    # Attraction along edges
+    d = pos[row] - pos[col]
+    length = np.sqrt(np.einsum('ij,ij->i', d, d))
+    energy += (length ** 3).sum() / (3 * k)
+    grad += incidence @ (d * (length / k)[:, None])
+
+    energy += 0.5 * gravity * np.einsum('ij,ij->', pos, pos)
+    grad += gravity * pos
+
+    return energy, grad.ravel()
+
+
+@lru_cache(maxsize=16)
+def _fr_positions(n, edges, k, seed, maxiter):
+    """
+    Cached L-BFGS FR layout for n nodes and a tuple of (row, col) index pairs.
+
+    Returns a read-only (n, 2) array, so repeated redraws of the same
+    sample skip the optimization.
+    """
+    edge_arr = np.array(edges, dtype=np.intp).reshape(-1, 2)
+    row, col = edge_arr[:, 0], edge_arr[:, 1]
+    num_edges = len(edge_arr)
+    incidence = sp.csr_array(
+        (np.r_[np.ones(num_edges), -np.ones(num_edges)],
+         (np.r_[row, col], np.r_[np.arange(num_edges), np.arange(num_edges)])),
+        shape=(n, num_edges))
+
+    x0 = np.random.default_rng(seed).standard_normal((n, 2)).ravel()
+    result = minimize(_fr_energy_grad, x0, args=(n, row, col, incidence, k),
+                      jac=True, method='L-BFGS-B', options={'maxiter': maxiter})
+
+    pos = nx.rescale_layout(result.x.reshape(n, 2))
+    pos.setflags(write=False)
+    return pos
+
+
+def _fr_layout(G, node_index=None, k=None, seed=42, maxiter=100, edges=None):
+    """
+    Force-directed layout by minimizing the FR energy with L-BFGS.
+
+    Args:
+        G: NetworkX graph (direction is ignored)
+        node_index: {node: row} for the output rows (default: order of G)
+        k: Optimal node distance (default 1/sqrt(n))
+        seed: Seed for the initial positions
+        maxiter: Maximum L-BFGS iterations
+        edges: Optional (E, 2) integer array of G's edges as node_index rows,
+               when the caller already has it (saves a walk over G)
+
+    Returns:
+        np.ndarray: (n, 2) read-only positions, rescaled to [-1, 1] like nx.spring_layout
+    """
+    if node_index is None:
+        node_index = {node: i for i, node in enumerate(G)}
+    n = len(node_index)
+    if n < 2:
+        return np.zeros((n, 2))
+    if k is None:
+        k = 1 / np.sqrt(n)
+
+    if edges is None:
+        edges = tuple((node_index[u], node_index[v]) for u, v in G.edges() if u != v)
+    else:
+        edges = np.asarray(edges)
+        edges = tuple(map(tuple, edges[edges[:, 0] != edges[:, 1]].tolist()))
+    return _fr_positions(n, edges, float(k), seed, maxiter)
+
+
+def _frontier_sample(G, sample_size, pagerank_scores, num_walkers=None, seed=42):
+    """
+    Frontier sampling: dependent random walks that keep the graph's local structure.
+
+    Walkers start at nodes drawn by PageRank. Each step moves one walker,
+    picked with probability proportional to its degree, to a random neighbor.
+
+    Args:
+        G: NetworkX graph (direction is ignored)
+        sample_size: Number of nodes to collect
+        pagerank_scores: Dict of PageRank scores for choosing start nodes
+        num_walkers: Number of walkers (default: sample_size // 10, between 1 and 50)
+        seed: Random seed
+
+    Returns:
+        list: Sampled nodes in visiting order (fewer than sample_size if the
+              walkers cannot reach enough nodes)
+    """
+    rng = random.Random(seed)
+    G_und = G.to_undirected(as_view=True) if G.is_directed() else G
+    nodes = list(G_und)
+    if not nodes:
+        return []
+    if num_walkers is None:
+        num_walkers = max(1, min(50, sample_size // 10))
+
+    weights = [pagerank_scores.get(node, 0) for node in nodes]
+    frontier = rng.choices(nodes, weights=weights if any(weights) else None, k=num_walkers)
+    sampled = dict.fromkeys(frontier)  # insertion-ordered set
+
+    walker_ids = range(num_walkers)
+    for _ in range(100 * sample_size):
+        if len(sampled) >= sample_size:
+            break
+        cum_degrees = list(accumulate(G_und.degree(node) for node in frontier))
+        if not cum_degrees[-1]:
+            break  # every walker is stuck on an isolated node
+        i = rng.choices(walker_ids, cum_weights=cum_degrees)[0]
+        frontier[i] = rng.choice(list(G_und[frontier[i]]))
+        sampled[frontier[i]] = None
+
+    return list(sampled)[:sample_size]
+
+
+def create_network_png(G, pagerank_scores, partition, output_path='network_viz.png', sample_size=300,
+                       sampler='topk'):
     """
     Create static network visualization as PNG.
 
@@ -46,55 +332,78 @@ def create_network_png(G, pagerank_scores, partition, output_path='network_viz.p
         G: NetworkX graph
         pagerank_scores: Dict of PageRank scores
         partition: Community partition dict
-        output_path: Path to save PNG
+        output_path: Path to save PNG, or a binary file-like object
+                     (e.g. io.BytesIO) to render in memory
         sample_size: Max nodes to visualize (for performance)
+        sampler: How to pick nodes when G is larger than sample_size:
+                 'topk' (highest PageRank) or 'frontier' (random-walk sample
+                 that keeps sparse structure instead of the dense core)
 
     Returns:
-        str: Path to saved PNG file
+        The output_path that was written to
     """
-    # Sample graph if too large - prioritize high PageRank nodes
+    # Sample graph if too large - by default prioritize high PageRank nodes
     if G.number_of_nodes() > sample_size:
-        top_nodes = sorted(pagerank_scores.items(), key=lambda x: x[1], reverse=True)[:sample_size]
-        nodes_to_include = [node for node, _ in top_nodes]
-        G_viz = G.subgraph(nodes_to_include).copy()
+        if sampler == 'frontier':
+            nodes_to_include = _frontier_sample(G, sample_size, pagerank_scores)
+        else:
+            nodes_to_include = [node for node, _ in get_top_nodes(pagerank_scores, sample_size)]
+        G_viz = G.subgraph(nodes_to_include)
     else:
         G_viz = G
 
     # Create layout with better spacing
-    pos = nx.spring_layout(G_viz, seed=42, k=1.5/((G_viz.number_of_nodes())**0.5), iterations=50)
+    # Positions come back as one (n, 2) array in `nodes` order, shared by edges and nodes.
+    # G_viz is usually a filtered subgraph view, so walk its nodes only once.
+    nodes = list(G_viz)
+    n = len(nodes)
+    node_to_idx = {node: i for i, node in enumerate(nodes)}
 
-    # Prepare node colors by community
-    unique_communities = set(partition.get(node, 0) for node in G_viz.nodes())
-    community_to_color = {comm: COMMUNITY_COLORS[i % len(COMMUNITY_COLORS)]
-                          for i, comm in enumerate(sorted(unique_communities))}
-    node_colors = [community_to_color[partition.get(node, 0)] for node in G_viz.nodes()]
+    # Edge endpoints and ratings in one pass: rows of (u index, v index, rating)
+    edge_arr = np.array([(node_to_idx[u], node_to_idx[v], rating)
+                         for u, v, rating in G_viz.edges(data='rating', default=1)],
+                        dtype=np.intp).reshape(-1, 3)
+
+    pos_arr = _fr_layout(G_viz, node_to_idx, k=1.5/(n**0.5), edges=edge_arr[:, :2])
+
+    # Prepare node colors by community: rank of each community id picks a palette entry
+    comm_values = np.fromiter((partition.get(node, 0) for node in nodes), dtype=np.int64, count=n)
+    _, comm_rank = np.unique(comm_values, return_inverse=True)
+    node_colors = comm_rank % len(COMMUNITY_COLORS)
 
     # Node sizes by PageRank with better scaling
-    pr_values = [pagerank_scores.get(node, 0.0001) for node in G_viz.nodes()]
-    max_pr = max(pr_values) if pr_values else 1
-    min_pr = min(pr_values) if pr_values else 0
+    pr_values = np.fromiter((pagerank_scores.get(node, 0.0001) for node in nodes),
+                            dtype=np.float64, count=n)
+    max_pr = pr_values.max() if n else 1
+    min_pr = pr_values.min() if n else 0
     # Scale between 50 and 500
-    node_sizes = [50 + 450 * ((pr - min_pr) / (max_pr - min_pr + 0.0001)) for pr in pr_values]
+    node_sizes = 50 + 450 * ((pr_values - min_pr) / (max_pr - min_pr + 0.0001))
 
-    # Separate positive and negative edges
-    positive_edges = [(u, v) for u, v, d in G_viz.edges(data=True) if d.get('rating', 1) > 0]
-    negative_edges = [(u, v) for u, v, d in G_viz.edges(data=True) if d.get('rating', 1) < 0]
+    positive_edges = edge_arr[edge_arr[:, 2] > 0, :2]
+    negative_edges = edge_arr[edge_arr[:, 2] < 0, :2]
 
     # Create figure
     fig, ax = plt.subplots(figsize=(16, 12), facecolor='#1a1a2e')
     ax.set_facecolor('#1a1a2e')
 
-    # Draw edges
-    if positive_edges:
-        nx.draw_networkx_edges(G_viz, pos, edgelist=positive_edges, edge_color='#00ff88',
-                               alpha=0.3, width=0.5, ax=ax, arrows=False)
-    if negative_edges:
-        nx.draw_networkx_edges(G_viz, pos, edgelist=negative_edges, edge_color='#ff4444',
-                               alpha=0.5, width=0.8, ax=ax, arrows=False)
+    # Draw all edges as a single LineCollection; distrust edges go last so they sit on top
+    drawn_edges = np.concatenate([positive_edges, negative_edges])
+    if len(drawn_edges):
+        style = np.repeat([0, 1], [len(positive_edges), len(negative_edges)])
+        # Reciprocal ratings trace the same segment twice: bin edges by (style, node pair),
+        # draw each bin once and widen it with the log of its count. Sorting on style
+        # first keeps distrust edges last.
+        bins, counts = np.unique(np.column_stack([style, np.sort(drawn_edges, axis=1)]),
+                                 axis=0, return_counts=True)
+        style, drawn_edges = bins[:, 0], bins[:, 1:]
+        edge_colors = np.array([to_rgba('#00ff88', 0.3), to_rgba('#ff4444', 0.5)])[style]
+        edge_widths = np.array([0.5, 0.8])[style] * (1 + np.log(counts))
+        ax.add_collection(LineCollection(pos_arr[drawn_edges], colors=edge_colors,
+                                         linewidths=edge_widths, zorder=1, rasterized=True))
 
     # Draw nodes
-    nx.draw_networkx_nodes(G_viz, pos, node_color=node_colors, node_size=node_sizes,
-                           alpha=0.85, ax=ax, edgecolors='white', linewidths=0.5)
+    ax.scatter(pos_arr[:, 0], pos_arr[:, 1], s=node_sizes, c=node_colors,
+               cmap=COMMUNITY_CMAP, vmin=0, vmax=len(COMMUNITY_COLORS) - 1, alpha=0.85, edgecolors='white', linewidths=0.5, zorder=2)
 
     ax.set_title('Bitcoin OTC Trust Network\nNode size = PageRank | Color = Community',
                  fontsize=18, fontweight='bold', color='white', pad=20)
@@ -114,9 +423,10 @@ def create_network_png(G, pagerank_scores, partition, output_path='network_viz.p
     ax.legend(handles=legend_elements, loc='upper right', fontsize=10,
               facecolor='#2a2a4e', edgecolor='white', labelcolor='white')
 
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='#1a1a2e')
-    plt.close()
+    # Fixed margins: bbox_inches='tight' would draw the whole figure twice to measure it
+    fig.subplots_adjust(left=0.02, right=0.98, top=0.92, bottom=0.02)
+    fig.savefig(output_path, format='png', dpi=150, facecolor='#1a1a2e')
+    plt.close(fig)
 
     return output_path
 
@@ -131,82 +441,77 @@ def create_pyvis_interactive(G_trust, nodes_to_include, pagerank_scores, partiti
     max_nodes = min(80, len(nodes_to_include))
     nodes_to_show = nodes_to_include[:max_nodes]
 
-    # Create PyVis network with dark theme
-    net = Network(width=width, height=height, bgcolor='#1a1a2e', font_color='#ffffff')
-    net.barnes_hut(gravity=-3000, central_gravity=0.3, spring_length=150, spring_strength=0.01)
-
     # Create subgraph
     subgraph = G_trust.subgraph(nodes_to_show)
 
     # Calculate size scaling
     pr_values = [pagerank_scores.get(n, 0) for n in nodes_to_show]
-    max_pr = max(pr_values) if pr_values else 1
-    min_pr = min(pr_values) if pr_values else 0
+    pr_array = np.asarray(pr_values, dtype=np.float64)
+    max_pr = pr_array.max() if len(pr_array) else 1
+    min_pr = pr_array.min() if len(pr_array) else 0
     pr_range = max_pr - min_pr + 0.0001
 
-    # Add nodes
-    for node in subgraph.nodes():
-        pr_score = pagerank_scores.get(node, 0)
-        comm = partition.get(node, 0)
-
-        # Scale size between 15 and 50
-        normalized_pr = (pr_score - min_pr) / pr_range
-        size = 15 + normalized_pr * 35
-
-        color = COMMUNITY_COLORS[comm % len(COMMUNITY_COLORS)]
-
-        # Get rank among displayed nodes
-        rank = sorted(pr_values, reverse=True).index(pr_score) + 1 if pr_score in pr_values else 0
-
-        net.add_node(
-            int(node),
-            label=f"#{rank}" if rank <= 20 else str(node),
-            size=size,
-            color=color,
-            title=f"<b>User {node}</b><br>Rank: #{rank}<br>PageRank: {pr_score:.6f}<br>Community: {comm}",
-            font={'size': 12, 'color': 'white'}
-        )
-
-    # Add edges with rating-based coloring
-    for u, v, data in subgraph.edges(data=True):
-        rating = data.get('rating', 1)
-        edge_color = '#44ff88' if rating > 0 else '#ff4444'
-        width = 1 + abs(rating) / 5
-
-        net.add_edge(int(u), int(v), color=edge_color, width=width,
-                     title=f"Rating: {rating:+d}")
+    # Per-node attributes as parallel lists, gathered once
+    node_ids = list(subgraph.nodes())
+    prs = [pagerank_scores.get(n, 0) for n in node_ids]
+    comms = [partition.get(n, 0) for n in node_ids]
+    pr_nodes = np.asarray(prs, dtype=np.float64)
+
+    # Rank among displayed nodes from one sort; ties share the best rank
+    ranks = (np.searchsorted(np.sort(-pr_array), -pr_nodes, side='left') + 1).tolist()
+
+    # Scale size between 15 and 50
+    sizes = (15 + (pr_nodes - min_pr) / pr_range * 35).tolist()
+    colors = np.array(COMMUNITY_COLORS)[np.asarray(comms, dtype=np.int64) % len(COMMUNITY_COLORS)].tolist()
+
+    titles = [f"<b>User {n}</b><br>Rank: #{r}<br>PageRank: {p:.6f}<br>Community: {c}"
+              for n, r, p, c in zip(node_ids, ranks, prs, comms)]
+
+    nodes = [
+        {
+            'id': int(node),
+            'label': f"#{rank}" if rank <= 20 else str(node),
+            'size': size,
+            'color': color,
+            'title': title,
+            'font': {'size': 12, 'color': 'white'}
+        }
+        for node, rank, color, size, title in zip(node_ids, ranks, colors, sizes, titles)
+    ]
 
-    # Generate HTML
-    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html') as f:
-        net.save_graph(f.name)
-        with open(f.name, 'r') as f2:
-            html = f2.read()
-        os.unlink(f.name)
+    # Build edges with rating-based coloring
+    edges = [
+        {'from': int(u), 'to': int(v), 'color': '#44ff88' if rating > 0 else '#ff4444',
+         'width': 1 + abs(rating) / 5, 'title': f"Rating: {rating:+d}"}
+        for u, v, rating in _induced_edges(G_trust, node_ids, weight='rating')
+    ]
 
-    return html
+    return _render_vis_html(nodes, edges, _VIS_OPTIONS_JSON['interactive'], width=width, height=height)
 
 
 def plot_rating_distribution(df):
     """Create Plotly histogram of rating distribution with better styling."""
-    rating_counts = df['rating'].value_counts().sort_index().reset_index()
-    rating_counts.columns = ['Rating', 'Count']
+    # Ratings are small integers, so count them with a shifted bincount
+    ratings = df['rating'].to_numpy(dtype=np.int64)
+    low = ratings.min() if len(ratings) else 0
+    counts = np.bincount(ratings - low)
+    present = np.flatnonzero(counts)
+    rating_values = present + low
+    counts = counts[present]
 
     # Color based on rating sign
-    rating_counts['Color'] = rating_counts['Rating'].apply(
-        lambda x: '#ff4444' if x < 0 else '#00ff88' if x > 0 else '#ffd93d'
-    )
+    colors = np.where(rating_values < 0, '#ff4444', np.where(rating_values > 0, '#00ff88', '#ffd93d'))
 
     fig = go.Figure()
 
-    # Add bars with custom colors
-    for _, row in rating_counts.iterrows():
-        fig.add_trace(go.Bar(
-            x=[row['Rating']],
-            y=[row['Count']],
-            marker_color=row['Color'],
-            showlegend=False,
-            hovertemplate=f"Rating: {row['Rating']}<br>Count: {row['Count']:,}<extra></extra>"
-        ))
+    # Single bar trace with per-bar colors
+    fig.add_trace(go.Bar(
+        x=rating_values,
+        y=counts,
+        marker_color=colors,
+        showlegend=False,
+        hovertemplate="Rating: %{x}<br>Count: %{y:,}<extra></extra>"
+    ))
 
     fig.update_layout(
         title={
@@ -270,15 +575,21 @@ def plot_centrality_comparison(pagerank_df):
 
 def plot_degree_distribution(G):
     """Plot degree distribution with power law indication."""
-    degrees = [d for n, d in G.degree()]
+    degrees = np.fromiter((d for _, d in G.degree()), dtype=np.int64, count=G.number_of_nodes())
+
+    # Bin here so the figure carries 50 bars instead of every node's degree
+    counts, bin_edges = np.histogram(degrees, bins=50)
 
     fig = go.Figure()
 
-    fig.add_trace(go.Histogram(
-        x=degrees,
-        nbinsx=50,
+    fig.add_trace(go.Bar(
+        x=(bin_edges[:-1] + bin_edges[1:]) / 2,
+        y=counts,
+        width=np.diff(bin_edges),
         marker_color='#00ccff',
-        opacity=0.8
+        opacity=0.8,
+        customdata=np.column_stack([bin_edges[:-1], bin_edges[1:]]),
+        hovertemplate="Degree: %{customdata[0]:.0f}-%{customdata[1]:.0f}<br>Count: %{y:,}<extra></extra>"
     ))
 
     fig.update_layout(
@@ -301,59 +612,40 @@ def create_centrality_subgraph_viz(G_trust, pagerank_scores, top_n=20):
     Focused, readable graph showing trust anchors and their connections.
     """
     # Get top N nodes
-    top_nodes = sorted(pagerank_scores.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    top_nodes = get_top_nodes(pagerank_scores, top_n)
     top_node_ids = [n for n, _ in top_nodes]
-    top_scores = {n: s for n, s in top_nodes}
-
-    # Create subgraph of just these nodes
-    subgraph = G_trust.subgraph(top_node_ids)
-
-    # Create PyVis network
-    net = Network(width='100%', height='600px', bgcolor='#1a1a2e', font_color='#ffffff')
-    net.barnes_hut(gravity=-2000, central_gravity=0.5, spring_length=200, spring_strength=0.01)
-
-    # Color gradient from green (top) to blue (lower ranked)
-    for rank, (node, score) in enumerate(top_nodes, 1):
-        # Gradient: #00ff88 (green) -> #00ccff (cyan) -> #4d96ff (blue)
-        if rank <= 7:
-            color = '#00ff88'  # Top tier - bright green
-        elif rank <= 14:
-            color = '#00ccff'  # Mid tier - cyan
-        else:
-            color = '#4d96ff'  # Lower tier - blue
-
-        # Size based on rank (larger = higher rank)
-        size = 45 - (rank * 1.5)  # 45 down to ~15
-
-        net.add_node(
-            int(node),
-            label=f"#{rank}\nUser {node}",
-            size=max(size, 15),
-            color=color,
-            title=f"<b>Rank #{rank}</b><br>User ID: {node}<br>PageRank: {score:.6f}<br>In-degree: {G_trust.in_degree(node)}",
-            font={'size': 14, 'color': 'white', 'face': 'arial'},
-            borderWidth=2,
-            borderWidthSelected=4
-        )
 
-    # Add edges between top nodes
-    for u, v, data in subgraph.edges(data=True):
-        rating = data.get('rating', 5)
-        net.add_edge(
-            int(u), int(v),
-            color='rgba(0, 255, 136, 0.6)',
-            width=1 + rating / 3,
-            title=f"Trust rating: +{rating}"
-        )
+    # Color gradient from green (top) to blue (lower ranked), in tiers of 7 ranks:
+    # #00ff88 (green) -> #00ccff (cyan) -> #4d96ff (blue)
+    ranks = np.arange(1, len(top_nodes) + 1)
+    colors = np.array(['#00ff88', '#00ccff', '#4d96ff'])[np.minimum((ranks - 1) // 7, 2)].tolist()
+
+    # Size based on rank (larger = higher rank), 45 down to 15
+    sizes = np.maximum(45 - ranks * 1.5, 15).tolist()
+    in_degrees = dict(G_trust.in_degree(top_node_ids))
+
+    nodes = [
+        {
+            'id': int(node),
+            'label': f"#{rank}\nUser {node}",
+            'size': size,
+            'color': color,
+            'title': f"<b>Rank #{rank}</b><br>User ID: {node}<br>PageRank: {score:.6f}<br>In-degree: {in_degrees[node]}",
+            'font': {'size': 14, 'color': 'white', 'face': 'arial'},
+            'borderWidth': 2,
+            'borderWidthSelected': 4
+        }
+        for rank, (node, score), color, size in zip(ranks.tolist(), top_nodes, colors, sizes)
+    ]
 
-    # Generate HTML
-    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html') as f:
-        net.save_graph(f.name)
-        with open(f.name, 'r') as f2:
-            html = f2.read()
-        os.unlink(f.name)
+    # Edges between top nodes
+    edges = [
+        {'from': int(u), 'to': int(v), 'color': 'rgba(0, 255, 136, 0.6)',
+         'width': 1 + rating / 3, 'title': f"Trust rating: +{rating}"}
+        for u, v, rating in _induced_edges(G_trust, top_node_ids, weight='rating')
+    ]
 
-    return html
+    return _render_vis_html(nodes, edges, _VIS_OPTIONS_JSON['centrality'])
 
 
 def create_community_viz(G_trust, partition, community_sizes, num_communities=3, max_nodes_per_community=30):
@@ -369,17 +661,23 @@ def create_community_viz(G_trust, partition, community_sizes, num_communities=3,
     nodes_to_show = []
     node_community_map = {}
 
+    # Undirected degrees for sampling, read through a view instead of copying the graph
+    G_und = G_trust.to_undirected(as_view=True) if G_trust.is_directed() else G_trust
+
+    # Invert the partition in one pass, keeping only the communities shown
+    comm_to_nodes = {comm_id: [] for comm_id in comm_ids}
+    for n, c in partition.items():
+        members = comm_to_nodes.get(c)
+        if members is not None:
+            members.append(n)
+
     for comm_id in comm_ids:
-        comm_nodes = [n for n, c in partition.items() if c == comm_id]
+        comm_nodes = comm_to_nodes[comm_id]
 
         # Sample if community is too large
         if len(comm_nodes) > max_nodes_per_community:
             # Prefer nodes with higher degree
-            if G_trust.is_directed():
-                G_und = G_trust.to_undirected()
-            else:
-                G_und = G_trust
-            node_degrees = [(n, G_und.degree(n)) for n in comm_nodes if n in G_und]
+            node_degrees = list(G_und.degree(n for n in comm_nodes if n in G_und))
             node_degrees.sort(key=lambda x: x[1], reverse=True)
             sampled = [n for n, _ in node_degrees[:max_nodes_per_community]]
         else:
@@ -392,47 +690,34 @@ def create_community_viz(G_trust, partition, community_sizes, num_communities=3,
     # Create subgraph
     subgraph = G_trust.subgraph(nodes_to_show)
 
-    # Create PyVis
-    net = Network(width='100%', height='600px', bgcolor='#1a1a2e', font_color='#ffffff')
-    net.barnes_hut(gravity=-1500, central_gravity=0.2, spring_length=120)
-
-    # Add nodes with community colors
-    for node in subgraph.nodes():
-        comm = node_community_map.get(node, 0)
-        comm_index = comm_ids.index(comm) if comm in comm_ids else 0
-        color = COMMUNITY_COLORS[comm_index % len(COMMUNITY_COLORS)]
-        comm_size = community_sizes.get(comm, 0)
-
-        net.add_node(
-            int(node),
-            label=str(node),
-            size=18,
-            color=color,
-            title=f"<b>User {node}</b><br>Community: {comm}<br>Community Size: {comm_size:,}",
-            font={'size': 10, 'color': 'white'}
-        )
-
-    # Add edges - highlight inter-community edges
-    for u, v in subgraph.edges():
-        u_comm = node_community_map.get(u, -1)
-        v_comm = node_community_map.get(v, -1)
-
-        if u_comm != v_comm:
-            # Inter-community edge - make it visible
-            net.add_edge(int(u), int(v), color='#ff6b6b', width=2,
-                        title="Inter-community connection")
-        else:
-            # Intra-community edge
-            net.add_edge(int(u), int(v), color='rgba(255,255,255,0.2)', width=0.5)
+    # Nodes with community colors
+    comm_colors = {comm: COMMUNITY_COLORS[i % len(COMMUNITY_COLORS)] for i, comm in enumerate(comm_ids)}
+    node_ids = list(subgraph.nodes())
+    comms = [node_community_map.get(node, 0) for node in node_ids]
+    nodes = [
+        {
+            'id': int(node),
+            'label': str(node),
+            'size': 18,
+            'color': comm_colors.get(comm, COMMUNITY_COLORS[0]),
+            'title': f"<b>User {node}</b><br>Community: {comm}<br>Community Size: {community_sizes.get(comm, 0):,}",
+            'font': {'size': 10, 'color': 'white'}
+        }
+        for node, comm in zip(node_ids, comms)
+    ]
 
-    # Generate HTML
-    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html') as f:
-        net.save_graph(f.name)
-        with open(f.name, 'r') as f2:
-            html = f2.read()
-        os.unlink(f.name)
+    # Edge style by whether the edge crosses communities (highlighted) or not (faded)
+    edge_styles = {
+        True: {'color': '#ff6b6b', 'width': 2, 'title': "Inter-community connection"},
+        False: {'color': 'rgba(255,255,255,0.2)', 'width': 0.5},
+    }
+    edges = [
+        {'from': int(u), 'to': int(v),
+         **edge_styles[node_community_map.get(u, -1) != node_community_map.get(v, -1)]}
+        for u, v in _induced_edges(G_trust, nodes_to_show)
+    ]
 
-    return html
+    return _render_vis_html(nodes, edges, _VIS_OPTIONS_JSON['community'])
 
 
 def create_suspicious_community_viz(G_trust, suspicious_communities, partition, max_display=5):
@@ -443,9 +728,9 @@ def create_suspicious_community_viz(G_trust, suspicious_communities, partition,
     if not suspicious_communities:
         return "<div style='color: #00ff88; padding: 20px;'><h3>No suspicious communities detected</h3></div>"
 
-    # Create PyVis
-    net = Network(width='100%', height='600px', bgcolor='#1a1a2e', font_color='#ffffff')
-    net.barnes_hut(gravity=-500, central_gravity=0.8, spring_length=80)
+    nodes = []
+    shown_in = {}  # user -> index of the displayed community it belongs to
+    colors = []
 
     # Show up to max_display suspicious communities
     for i, comm_info in enumerate(suspicious_communities[:max_display]):
@@ -453,31 +738,24 @@ def create_suspicious_community_viz(G_trust, suspicious_communities, partition,
         comm_id = comm_info.get('Community ID', i)
 
         color = '#ff4444' if i == 0 else COMMUNITY_COLORS[(i + 5) % len(COMMUNITY_COLORS)]
+        colors.append(color)
 
-        for node in comm_users:
-            net.add_node(
-                int(node),
-                label=str(node),
-                size=20,
-                color=color,
-                title=f"<b>SUSPICIOUS</b><br>User {node}<br>Community {comm_id}<br>Size: {len(comm_users)}",
-                font={'size': 12, 'color': 'white'},
-                borderWidth=3
-            )
-
-        # Add edges within this community
-        subgraph = G_trust.subgraph(comm_users)
-        for u, v in subgraph.edges():
-            net.add_edge(int(u), int(v), color=color, width=2)
+        nodes.extend(
+            {'id': int(node), 'label': str(node), 'size': 20, 'color': color,
+             'title': f"<b>SUSPICIOUS</b><br>User {node}<br>Community {comm_id}<br>Size: {len(comm_users)}",
+             'font': {'size': 12, 'color': 'white'}, 'borderWidth': 3}
+            for node in comm_users
+        )
+        shown_in.update(dict.fromkeys(comm_users, i))
 
-    # Generate HTML
-    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html') as f:
-        net.save_graph(f.name)
-        with open(f.name, 'r') as f2:
-            html = f2.read()
-        os.unlink(f.name)
+    # Edges within each community, from one slice over all displayed users
+    edges = [
+        {'from': int(u), 'to': int(v), 'color': colors[shown_in[u]], 'width': 2}
+        for u, v in _induced_edges(G_trust, shown_in)
+        if shown_in[u] == shown_in[v]
+    ]
 
-    return html
+    return _render_vis_html(nodes, edges, _VIS_OPTIONS_JSON['suspicious'])
 
 
 def create_path_viz(G_trust, path, pagerank_scores=None):
@@ -488,29 +766,25 @@ def create_path_viz(G_trust, path, pagerank_scores=None):
     if not path or len(path) < 2:
         return "<div style='color: #ffd93d; padding: 20px;'><h3>No path to visualize</h3></div>"
 
+    path_set = set(path)
+
     # Get only immediate neighbors for context (1 hop from path)
-    context_nodes = set(path)
+    context_nodes = set(path_set)
     for node in path:
         if node in G_trust:
-            neighbors = list(G_trust.successors(node)) + list(G_trust.predecessors(node))
-            # Add only a few neighbors for context
-            context_nodes.update(neighbors[:5])
+            # Add only a few neighbors for context, without listing a hub's whole neighborhood
+            neighbors = chain(G_trust.successors(node), G_trust.predecessors(node))
+            context_nodes.update(islice(neighbors, 5))
 
     # Limit total nodes
     if len(context_nodes) > 50:
-        context_nodes = set(path)
-
-    # Create subgraph
-    subgraph = G_trust.subgraph(context_nodes)
-
-    # Create PyVis
-    net = Network(width='100%', height='600px', bgcolor='#1a1a2e', font_color='#ffffff')
-    net.barnes_hut(gravity=-1500, central_gravity=0.3, spring_length=150)
+        context_nodes = path_set
 
     # Path edges set
     path_edges = set((path[i], path[i + 1]) for i in range(len(path) - 1))
 
-    # Add nodes
+    # Path nodes
+    nodes = []
     for i, node in enumerate(path):
         if i == 0:
             color = '#00ff88'  # Start - green
@@ -525,137 +799,134 @@ def create_path_viz(G_trust, path, pagerank_scores=None):
             label = f"Step {i}\n{node}"
             size = 28
 
-        net.add_node(
-            int(node),
-            label=label,
-            size=size,
-            color=color,
-            title=f"<b>{'Source' if i == 0 else 'Target' if i == len(path) - 1 else f'Step {i}'}</b><br>User {node}",
-            font={'size': 12, 'color': 'white'},
-            borderWidth=3
-        )
-
-    # Add context nodes (not in path)
-    for node in context_nodes - set(path):
-        net.add_node(
-            int(node),
-            label=str(node),
-            size=10,
-            color='#666666',
-            title=f"Context node: User {node}",
-            font={'size': 8, 'color': '#888888'}
-        )
+        nodes.append({
+            'id': int(node),
+            'label': label,
+            'size': size,
+            'color': color,
+            'title': f"<b>{'Source' if i == 0 else 'Target' if i == len(path) - 1 else f'Step {i}'}</b><br>User {node}",
+            'font': {'size': 12, 'color': 'white'},
+            'borderWidth': 3
+        })
+
+    # Context nodes (not in path)
+    nodes.extend(
+        {'id': int(node), 'label': str(node), 'size': 10, 'color': '#666666',
+         'title': f"Context node: User {node}", 'font': {'size': 8, 'color': '#888888'}}
+        for node in context_nodes - path_set
+    )
 
-    # Add edges
-    for u, v, data in subgraph.edges(data=True):
-        rating = data.get('rating', 0)
+    # Edges
+    edges = []
+    for u, v, rating in _induced_edges(G_trust, context_nodes, weight='rating'):
         if (u, v) in path_edges:
             # Path edge - highlight strongly
-            net.add_edge(int(u), int(v), color='#ffd93d', width=5,
-                        title=f"PATH EDGE<br>Rating: +{rating}")
+            edges.append({'from': int(u), 'to': int(v), 'color': '#ffd93d', 'width': 5,
+                          'title': f"PATH EDGE<br>Rating: +{rating}"})
         else:
             # Context edge
-            net.add_edge(int(u), int(v), color='rgba(255,255,255,0.15)', width=0.5)
+            edges.append({'from': int(u), 'to': int(v), 'color': 'rgba(255,255,255,0.15)', 'width': 0.5})
 
-    # Generate HTML
-    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html') as f:
-        net.save_graph(f.name)
-        with open(f.name, 'r') as f2:
-            html = f2.read()
-        os.unlink(f.name)
-
-    return html
+    return _render_vis_html(nodes, edges, _VIS_OPTIONS_JSON['path'])
 
 
 def create_component_viz(G, show_largest=True, show_smallest_n=0, max_nodes=100):
     """
     Visualize components with reasonable node limits.
     """
-    # Get components
+    # Get components (a generator; only listed when the smallest ones are wanted)
     if G.is_directed():
-        components = list(nx.weakly_connected_components(G))
+        components = nx.weakly_connected_components(G)
     else:
-        components = list(nx.connected_components(G))
-
-    # Sort by size
-    components.sort(key=len, reverse=True)
+        components = nx.connected_components(G)
 
-    if not components:
-        return "<div style='color: #ffd93d; padding: 20px;'><h3>No components found</h3></div>"
+    no_components = "<div style='color: #ffd93d; padding: 20px;'><h3>No components found</h3></div>"
 
     # Select which to show
-    if show_largest:
-        # Show sample from largest component
-        selected_nodes = list(components[0])
-        if len(selected_nodes) > max_nodes:
-            # Sample nodes with higher degree
-            G_comp = G.subgraph(selected_nodes)
-            degrees = dict(G_comp.degree())
-            selected_nodes = sorted(degrees.keys(), key=lambda x: degrees[x], reverse=True)[:max_nodes]
-        title_text = f"Largest Component (showing {len(selected_nodes)} of {len(components[0])} nodes)"
+    if show_largest or show_smallest_n <= 0:
+        # Only the largest component is needed: keep a running max instead of sorting all
+        largest = max(components, key=len, default=None)
+        if largest is None:
+            return no_components
+
+        if show_largest:
+            # Show sample from largest component
+            selected_nodes = list(largest)
+            if len(selected_nodes) > max_nodes:
+                # Sample nodes with higher degree. A component holds all of its nodes'
+                # neighbors, so degrees in G equal degrees in the component subgraph.
+                degrees = dict(G.degree(selected_nodes))
+                selected_nodes = nlargest(max_nodes, degrees, key=degrees.get)
+            title_text = f"Largest Component (showing {len(selected_nodes)} of {len(largest)} nodes)"
+        else:
+            selected_nodes = list(largest)[:max_nodes]
+            title_text = "Component View"
         single_component = True
-    elif show_smallest_n > 0:
+    else:
+        # Select the n smallest with a bounded heap instead of sorting every component.
+        # Ties go to later components, and the result is listed largest first, matching
+        # the tail of a stable descending sort.
+        smallest = nsmallest(show_smallest_n, enumerate(components), key=lambda ic: (len(ic[1]), -ic[0]))
+        if not smallest:
+            return no_components
+
         # Show smallest components entirely
         selected_nodes = []
         component_assignments = {}
-        for i, comp in enumerate(components[-show_smallest_n:]):
+        for i, (_, comp) in enumerate(reversed(smallest)):
             for node in comp:
                 selected_nodes.append(node)
                 component_assignments[node] = i
         title_text = f"Smallest {show_smallest_n} Components ({len(selected_nodes)} nodes total)"
         single_component = False
-    else:
-        selected_nodes = list(components[0])[:max_nodes]
-        title_text = "Component View"
-        single_component = True
 
-    # Create subgraph
-    subgraph = G.subgraph(selected_nodes)
-
-    # Create PyVis
-    net = Network(width='100%', height='600px', bgcolor='#1a1a2e', font_color='#ffffff')
-    net.barnes_hut(gravity=-2000, central_gravity=0.3, spring_length=100)
-
-    # Add nodes
-    for node in subgraph.nodes():
-        if single_component:
-            color = '#00ff88'
-        else:
-            comp_idx = component_assignments.get(node, 0)
-            color = COMMUNITY_COLORS[comp_idx % len(COMMUNITY_COLORS)]
-
-        net.add_node(
-            int(node),
-            label=str(node),
-            size=15,
-            color=color,
-            title=f"User {node}<br>Degree: {subgraph.degree(node)}",
-            font={'size': 9, 'color': 'white'}
-        )
-
-    # Add edges
-    for u, v, data in subgraph.edges(data=True):
-        rating = data.get('rating', 0)
-        edge_color = 'rgba(0,255,136,0.4)' if rating > 0 else 'rgba(255,68,68,0.4)'
-        net.add_edge(int(u), int(v), color=edge_color, width=0.8)
+    # Induced edges, sliced once; counting their endpoints gives each node's
+    # degree within the view without walking a subgraph view per node
+    induced = _induced_edges(G, selected_nodes, weight='rating')
+    if G.is_directed():
+        degrees = Counter(chain.from_iterable((u, v) for u, v, _ in induced))
+    else:
+        # The symmetric CSR lists each edge from both ends, so count row endpoints
+        # only; a self-loop is listed once but adds two to its node's degree
+        degrees = Counter(u for u, _, _ in induced)
+        degrees.update(u for u, v, _ in induced if u == v)
+
+    # Nodes
+    node_ids = list(dict.fromkeys(selected_nodes))
+    if single_component:
+        colors = ['#00ff88'] * len(node_ids)
+    else:
+        colors = [COMMUNITY_COLORS[component_assignments.get(node, 0) % len(COMMUNITY_COLORS)]
+                  for node in node_ids]
+    nodes = [
+        {
+            'id': int(node),
+            'label': str(node),
+            'size': 15,
+            'color': color,
+            'title': f"User {node}<br>Degree: {degrees[node]}",
+            'font': {'size': 9, 'color': 'white'}
+        }
+        for node, color in zip(node_ids, colors)
+    ]
 
-    # Generate HTML
-    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html') as f:
-        net.save_graph(f.name)
-        with open(f.name, 'r') as f2:
-            html = f2.read()
-        os.unlink(f.name)
+    # Edges
+    edges = [
+        {'from': int(u), 'to': int(v),
+         'color': 'rgba(0,255,136,0.4)' if rating > 0 else 'rgba(255,68,68,0.4)', 'width': 0.8}
+        for u, v, rating in induced
+    ]
 
-    return html
+    return _render_vis_html(nodes, edges, _VIS_OPTIONS_JSON['component'])
 
 
-def create_reachability_viz(G_trust, source_node, reachability_data, max_nodes_per_hop=15):
+def create_reachability_viz(G_trust, source_node, reachability_data, max_nodes_per_hop=15, seed=42):
     """
     Visualize trust radius/reachability from a source node.
     Shows concentric circles of nodes at different hop distances.
+    Large hops are sampled with a seeded generator, so reruns draw the same nodes.
     """
-    net = Network(width='100%', height='600px', bgcolor='#1a1a2e', font_color='#ffffff')
-    net.barnes_hut(gravity=-1500, central_gravity=0.5, spring_length=100)
+    rng = np.random.default_rng(seed)
 
     # Colors for different hop distances
     hop_colors = {
@@ -667,68 +938,52 @@ def create_reachability_viz(G_trust, source_node, reachability_data, max_nodes_p
 
     nodes_added = set()
 
-    # Add source node
-    net.add_node(
-        int(source_node),
-        label=f"SOURCE\n{source_node}",
-        size=40,
-        color=hop_colors[0],
-        title=f"<b>Source Node</b><br>User {source_node}",
-        font={'size': 14, 'color': 'white'},
-        borderWidth=3
-    )
+    # Source node
+    nodes = [{
+        'id': int(source_node),
+        'label': f"SOURCE\n{source_node}",
+        'size': 40,
+        'color': hop_colors[0],
+        'title': f"<b>Source Node</b><br>User {source_node}",
+        'font': {'size': 14, 'color': 'white'},
+        'borderWidth': 3
+    }]
     nodes_added.add(source_node)
 
     # Add nodes at each hop distance
     reachable_at_hop = reachability_data.get('reachable_at_hop', {})
 
+    # One BFS from the source, bucketed by hop distance
+    hop_layers = {}
+    if source_node in G_trust:
+        for hop, layer in enumerate(nx.bfs_layers(G_trust, source_node)):
+            if hop > 3:
+                break
+            hop_layers[hop] = layer
+
     for hop in range(1, 4):
-        # This would need the actual nodes, not just counts
-        # For now, we'll use BFS to get actual nodes
-        from collections import deque
-        if hop == 1:
-            hop_nodes = list(G_trust.successors(source_node)) if source_node in G_trust else []
-        else:
-            # Get nodes at this hop distance
-            hop_nodes = []
-            queue = deque([(source_node, 0)])
-            visited = {source_node}
-            while queue:
-                node, dist = queue.popleft()
-                if dist == hop:
-                    hop_nodes.append(node)
-                elif dist < hop and node in G_trust:
-                    for neighbor in G_trust.successors(node):
-                        if neighbor not in visited:
-                            visited.add(neighbor)
-                            queue.append((neighbor, dist + 1))
+        hop_nodes = hop_layers.get(hop, [])
 
         # Sample if too many
         if len(hop_nodes) > max_nodes_per_hop:
-            hop_nodes = random.sample(hop_nodes, max_nodes_per_hop)
+            hop_nodes = [hop_nodes[i] for i in rng.choice(len(hop_nodes), size=max_nodes_per_hop, replace=False)]
 
         for node in hop_nodes:
             if node not in nodes_added:
-                net.add_node(
-                    int(node),
-                    label=str(node),
-                    size=25 - (hop * 5),
-                    color=hop_colors.get(hop, '#666666'),
-                    title=f"<b>{hop}-hop from source</b><br>User {node}",
-                    font={'size': 10, 'color': 'white'}
-                )
+                nodes.append({
+                    'id': int(node),
+                    'label': str(node),
+                    'size': 25 - (hop * 5),
+                    'color': hop_colors.get(hop, '#666666'),
+                    'title': f"<b>{hop}-hop from source</b><br>User {node}",
+                    'font': {'size': 10, 'color': 'white'}
+                })
                 nodes_added.add(node)
 
-    # Add edges between shown nodes
-    subgraph = G_trust.subgraph(nodes_added)
-    for u, v in subgraph.edges():
-        net.add_edge(int(u), int(v), color='rgba(255,255,255,0.3)', width=1)
-
-    # Generate HTML
-    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html') as f:
-        net.save_graph(f.name)
-        with open(f.name, 'r') as f2:
-            html = f2.read()
-        os.unlink(f.name)
+    # Edges between shown nodes
+    edges = [
+        {'from': int(u), 'to': int(v), 'color': 'rgba(255,255,255,0.3)', 'width': 1}
+        for u, v in _induced_edges(G_trust, nodes_added)
+    ]
 
-    return html
+    return _render_vis_html(nodes, edges, _VIS_OPTIONS_JSON['reachability'])
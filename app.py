@@ -12,13 +12,19 @@ Version: 3.0 (Enhanced Visualizations with Proper Clustering, Color Coding, Sizi
 - Added suspicious community visualization
 """
 
+import io
+import re
+from heapq import nsmallest
+from importlib.util import find_spec
+
 import streamlit as st
+import numpy as np
 import pandas as pd
-import networkx as nx
 from pathlib import Path
 
-# Import analysis modules
-from analysis import centrality, community, paths, components, reachability, visualization
+# NetworkX and the analysis modules (with their optional accelerators) take over a
+# second to import, so they are imported where first needed rather than here; the
+# page and sidebar render before that cost is paid
 
 # ============================================================================
 # PAGE CONFIGURATION
@@ -35,11 +41,10 @@ st.set_page_config(
 # CUSTOM CSS - FIXED
 # ============================================================================
 
-st.markdown("""
+THEME_CSS = """
 <style>
     /* Remove white header bar */
     header[data-testid="stHeader"] {
-        background-color: transparent !important;
         background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%) !important;
     }
     
@@ -48,19 +53,15 @@ st.markdown("""
         background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%);
     }
     
-    /* Fix dropdown/selectbox text color - make it black for readability */
+    /* Dropdowns and text inputs: black text on white for readability */
     .stSelectbox [data-baseweb="select"],
-    .stSelectbox [data-baseweb="select"] * {
+    .stSelectbox [data-baseweb="select"] *,
+    .stTextInput input,
+    .stNumberInput input {
         background-color: rgba(255, 255, 255, 0.95) !important;
         color: #000000 !important;
     }
 
-    .stSelectbox [data-baseweb="select"] > div,
-    .stSelectbox [data-baseweb="select"] > div > div {
-        color: #000000 !important;
-        background-color: rgba(255, 255, 255, 0.95) !important;
-    }
-
     .stSelectbox option,
     [data-baseweb="menu"] *,
     [data-baseweb="popover"] * {
@@ -68,42 +69,20 @@ st.markdown("""
         background-color: #ffffff !important;
     }
 
-    /* Fix multiselect */
+    /* Black text: multiselect tags and info/warning/error boxes */
     .stMultiSelect [data-baseweb="select"] *,
-    .stMultiSelect [data-baseweb="tag"] * {
-        color: #000000 !important;
-    }
-
-    /* Fix text input */
-    .stTextInput input,
-    .stNumberInput input {
+    .stMultiSelect [data-baseweb="tag"] *,
+    .stAlert,
+    .stAlert p, .stAlert span, .stAlert div {
         color: #000000 !important;
-        background-color: rgba(255, 255, 255, 0.95) !important;
-    }
-
-    /* Fix slider labels */
-    .stSlider [data-baseweb="slider"] {
-        color: #ffffff !important;
-    }
-
-    /* Fix radio buttons text */
-    .stRadio label span {
-        color: #ffffff !important;
     }
 
-    /* Fix expander content text on white background */
+    /* White text: slider labels, radio buttons, expander content */
+    .stSlider [data-baseweb="slider"],
+    .stRadio label span,
     .streamlit-expanderContent {
         color: #ffffff !important;
     }
-
-    /* Ensure info/warning/error boxes have black text */
-    .stAlert > div {
-        color: #000000 !important;
-    }
-
-    .stAlert p, .stAlert span, .stAlert div {
-        color: #000000 !important;
-    }
     
     /* Metrics */
     [data-testid="stMetricValue"] {
@@ -190,11 +169,6 @@ st.markdown("""
         transform: translateY(-2px);
     }
     
-    /* Alerts */
-    .stAlert {
-        color: #000000 !important;
-    }
-    
     /* Expanders */
     .streamlit-expanderHeader {
         background: rgba(255, 255, 255, 0.1);
@@ -202,36 +176,211 @@ st.markdown("""
         padding: 0.5rem;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource(show_spinner=False)
+def minify_css(css):
+    """
+    Strip comments and collapse whitespace so less CSS goes over the websocket each rerun.
+
+    Cached across reruns (the script, and any lru_cache defined in it, is re-executed
+    on every interaction), so the regex passes run once per process.
+    """
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};])\s*', r'\1', css).strip()
+
+st.markdown(minify_css(THEME_CSS), unsafe_allow_html=True)
 
 # ============================================================================
 # DATA LOADING
 # ============================================================================
 
+# Ratings run from -10 to 10; the threshold slider covers |rating| 0..MAX_RATING
+MAX_RATING = 10
+
+# Compact column types: node ids fit int32 and ratings are in [-10, 10]
+RATING_DTYPES = {'source': 'int32', 'target': 'int32', 'rating': 'int8', 'time': 'float64'}
+
+@st.cache_resource(show_spinner=False)
+def read_ratings(file_path, file_mtime=None):
+    """
+    Parse the ratings CSV into {column: array}, once per file version.
+
+    Alongside the file's columns, 'weight' holds |rating| for the graphs.
+    Cached as a shared resource (never copied), so callers must not modify
+    the arrays; file_mtime only keys the cache.
+    """
+    # The file is four numeric columns, so numpy parses it without building a frame
+    data = np.loadtxt(file_path, delimiter=',', ndmin=2)
+    columns = {name: data[:, i].astype(dtype) for i, (name, dtype) in enumerate(RATING_DTYPES.items())}
+    # |rating| is both the filter key and the graphs' edge weight; compute it once here
+    columns['weight'] = np.abs(columns['rating'])
+    return columns
+
 @st.cache_data(show_spinner=False)
-def load_data(file_path, min_rating_threshold=0):
-    """Load and filter CSV data."""
+def load_arrays(file_path, min_rating_threshold=0, file_mtime=None):
+    """
+    Get the rating columns filtered by |rating|.
+
+    Filters the parsed file in memory, so a new threshold does not re-read it.
+    """
     try:
-        df = pd.read_csv(file_path, names=['source', 'target', 'rating', 'time'])
-        return df[df['rating'].abs() >= min_rating_threshold].copy()
+        columns = read_ratings(file_path, file_mtime)
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return None
+    if min_rating_threshold <= 0:
+        return columns
+    return take_rows(columns, columns['weight'] >= min_rating_threshold)
+
+@st.cache_data(show_spinner=False)
+def load_data(file_path, min_rating_threshold=0, file_mtime=None):
+    """Load and filter the ratings as a DataFrame for the tables and charts."""
+    columns = load_arrays(file_path, min_rating_threshold, file_mtime)
+    if columns is None:
+        return None
+    return pd.DataFrame({name: columns[name] for name in RATING_DTYPES})
+
+@st.cache_data(show_spinner=False)
+def summarize_ratings(file_path, min_rating_threshold=0, file_mtime=None):
+    """Rating sign counts and distinct user count shown across the tabs, computed on the column arrays."""
+    columns = load_arrays(file_path, min_rating_threshold, file_mtime)
+    rating = columns['rating']
+    num_positive = int(np.count_nonzero(rating > 0))
+    num_negative = int(np.count_nonzero(rating < 0))
+    return {
+        'num_positive': num_positive,
+        'num_negative': num_negative,
+        'pct_positive': num_positive / len(rating) * 100 if len(rating) else 0.0,
+        # Sorted-array union of the int32 id columns, no per-id Python objects
+        'num_users': int(np.union1d(columns['source'], columns['target']).size),
+    }
+
+def take_rows(columns, index):
+    """Select the same rows (mask or positions) from every column array."""
+    index = np.asarray(index)
+    if index.dtype == bool:
+        # Resolve the mask to positions once rather than rescanning it for each column
+        index = np.flatnonzero(index)
+    return {name: values[index] for name, values in columns.items()}
 
-def build_graphs(df):
-    """Build NetworkX graphs from dataframe."""
+def graph_from_ratings(columns, node_order=None):
+    """Build a rating DiGraph from rating columns, listing nodes in node_order if given."""
+    import networkx as nx
     G = nx.DiGraph()
-    for _, row in df.iterrows():
-        G.add_edge(row['source'], row['target'], rating=row['rating'], time=row['time'], weight=abs(row['rating']))
+    if node_order is not None:
+        endpoints = set(np.union1d(columns['source'], columns['target']).tolist())
+        G.add_nodes_from(n for n in node_order if n in endpoints)
+    # Bulk insert from plain column lists (iterrows built a Series per row and upcast ids to float)
+    sources, targets, ratings, times, weights = (
+        columns[col].tolist() for col in ['source', 'target', 'rating', 'time', 'weight']
+    )
+    G.add_edges_from(
+        (u, v, {'rating': r, 'time': t, 'weight': w})
+        for u, v, r, t, w in zip(sources, targets, ratings, times, weights)
+    )
+    return G
+
+def build_graphs(ratings):
+    """Build NetworkX graphs from the rating column arrays."""
+    from analysis import csr
+    G = graph_from_ratings(ratings)
+    
+    # Trust/distrust graphs come straight from rating masks instead of re-walking G's edges.
+    # Rows are grouped by source in G's node order so adjacency order matches G.
+    position = {node: i for i, node in enumerate(G)}
+    source_position = np.fromiter(map(position.__getitem__, ratings['source'].tolist()),
+                                  dtype=np.intp, count=len(ratings['source']))
+    ratings = take_rows(ratings, np.argsort(source_position, kind='stable'))
+    rating = ratings['rating']
     
-    trust_edges = [(u, v) for u, v, d in G.edges(data=True) if d['rating'] > 0]
-    G_trust = G.edge_subgraph(trust_edges).copy()
+    trust_rows, distrust_rows = take_rows(ratings, rating > 0), take_rows(ratings, rating < 0)
+    G_trust = graph_from_ratings(trust_rows, node_order=G)
+    G_distrust = graph_from_ratings(distrust_rows, node_order=G)
     
-    distrust_edges = [(u, v) for u, v, d in G.edges(data=True) if d['rating'] < 0]
-    G_distrust = G.edge_subgraph(distrust_edges).copy()
+    # Seed the shared CSR adjacency from the same columns, so PageRank, BFS and the
+    # views never walk the adjacency dicts to build it
+    for graph, rows in ((G, ratings), (G_trust, trust_rows), (G_distrust, distrust_rows)):
+        csr.seed_csr_views(graph, rows['source'], rows['target'],
+                           weights={'rating': rows['rating'], 'weight': rows['weight']})
     
     return G, G_trust, G_distrust
 
+@st.cache_resource(show_spinner=False)
+def load_all_graphs(file_path, file_mtime=None):
+    """
+    Build the rating graphs for every slider threshold at once, per dataset.
+
+    There are only MAX_RATING + 1 thresholds and all of them together build
+    in about a second, so any later threshold is a dict lookup. Thresholds
+    that keep the same rows as the one below (no rating is 0) share its
+    graphs. Cached as a resource: the graph objects (and the analysis
+    modules' CSR caches with them) are shared across reruns, so callers
+    must not modify them.
+
+    Returns:
+        dict: {threshold: (G, G_trust, G_distrust)}, or None if loading failed
+    """
+    all_graphs = {}
+    previous_rows = None
+    for threshold in range(MAX_RATING + 1):
+        columns = load_arrays(file_path, threshold, file_mtime)
+        if columns is None:
+            return None
+        # Filtering is monotonic, so an unchanged row count means unchanged rows
+        num_rows = len(columns['rating'])
+        if num_rows != previous_rows:
+            graphs = build_graphs(columns)
+            previous_rows = num_rows
+        all_graphs[threshold] = graphs
+    return all_graphs
+
+# Longest PageRank leaderboard any tab shows (the network tab's node slider maximum)
+TOP_PAGERANK_N = 100
+
+@st.cache_data(show_spinner=False)
+def run_analytics(data_key, _G, _G_trust, use_gpu=False):
+    """
+    Compute the analytics shown across the tabs, once per dataset and filter.
+
+    Like render_network_png, the graphs are skipped by Streamlit's hashing and
+    data_key (path, mtime, min rating) identifies them.
+
+    Returns:
+        tuple: (pagerank_scores, top_pagerank, partition, community_sizes,
+            comp_stats, connectivity, suspicious), where top_pagerank is the
+            TOP_PAGERANK_N best (node, score) pairs, best first
+    """
+    from analysis import centrality, community, components
+    pagerank_scores = centrality.compute_pagerank(_G_trust, use_gpu=use_gpu)
+    top_pagerank = centrality.get_top_nodes(pagerank_scores, n=TOP_PAGERANK_N)
+    partition, community_sizes = community.detect_communities(_G_trust, use_gpu=use_gpu)
+    comp_stats = components.analyze_components(_G)
+    connectivity = components.analyze_component_connectivity(_G)
+    suspicious = community.find_suspicious_communities(_G_trust, partition, community_sizes, max_size=10)
+    return pagerank_scores, top_pagerank, partition, community_sizes, comp_stats, connectivity, suspicious
+
+@st.cache_data(show_spinner=False)
+def render_network_png(data_key, _G_trust, _pagerank_scores, _partition, use_gpu=False, sample_size=300):
+    """
+    Render the static network PNG to bytes, once per dataset, filter and backend.
+
+    The graph and scores are fully determined by data_key (path, mtime, min rating)
+    and use_gpu (the partition depends on the community backend), so only those are
+    hashed; the underscored arguments are skipped by Streamlit.
+    """
+    from analysis import visualization
+    png_buffer = io.BytesIO()
+    visualization.create_network_png(_G_trust, _pagerank_scores, _partition,
+                                     output_path=png_buffer, sample_size=sample_size)
+    return png_buffer.getvalue()
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def file_meta(file_path, file_size):
+    """Sidebar label parts (name, size in KB) for a dataset; file_size keys the cache so a replaced file relabels."""
+    return Path(file_path).name, f"{file_size / 1024:.0f}"
+
 # ============================================================================
 # SIDEBAR
 # ============================================================================
@@ -240,15 +389,23 @@ st.sidebar.title("🔐 Crypto-Trust Analytics")
 st.sidebar.markdown("---")
 
 data_path = 'soc-sign-bitcoinotc.csv'
-if not Path(data_path).exists():
+data_file = Path(data_path)
+# One stat per rerun: it answers "exists?" and gives the size and the mtime cache key.
+# Not cached, since a cached probe would hide a replaced file.
+try:
+    data_stat = data_file.stat()
+except FileNotFoundError:
     st.sidebar.error("⚠️ Dataset not found")
     st.stop()
 
-st.sidebar.success(f"✅ Dataset: {Path(data_path).name}")
-st.sidebar.markdown(f"**Size**: {Path(data_path).stat().st_size / 1024:.0f} KB")
+data_name, data_size_kb = file_meta(data_path, data_stat.st_size)
+st.sidebar.success(f"✅ Dataset: {data_name}")
+st.sidebar.markdown(f"**Size**: {data_size_kb} KB")
 
 st.sidebar.markdown("### 🎛️ Filters")
-min_rating = st.sidebar.slider("Minimum Rating Threshold", 0, 10, 0)
+min_rating = st.sidebar.slider("Minimum Rating Threshold", 0, MAX_RATING, 0)
+# Only offered when cuGraph (and so a GPU) is available; find_spec avoids importing it here
+use_gpu = find_spec('cugraph') is not None and st.sidebar.toggle("⚡ GPU acceleration (cuGraph)", value=True)
 
 run_analysis = st.sidebar.button("🚀 Run Analysis", use_container_width=True)
 
@@ -266,23 +423,38 @@ Bitcoin OTC trust network analysis with:
 # MAIN APP
 # ============================================================================
 
-if run_analysis or 'data_loaded' in st.session_state:
+# The threshold only takes effect on "Run Analysis"; other widget reruns reuse the analysed one
+if run_analysis:
+    st.session_state['analysis_rating'] = min_rating
+
+if 'analysis_rating' in st.session_state:
+    analysis_rating = st.session_state['analysis_rating']
+    data_key = (data_path, data_stat.st_mtime, analysis_rating)
+    if min_rating != analysis_rating:
+        st.sidebar.info(f"Showing threshold {analysis_rating}; press Run Analysis to apply {min_rating}.")
+    
+    from analysis import centrality, community, paths, components, reachability, visualization
     
     # Load data
     with st.spinner("🔄 Loading data..."):
-        df = load_data(data_path, min_rating)
+        df = load_data(data_path, analysis_rating, data_stat.st_mtime)
         if df is None:
             st.stop()
-        G, G_trust, G_distrust = build_graphs(df)
-        st.session_state['data_loaded'] = True
+        # Graphs stay in the session while the dataset and threshold are unchanged
+        if st.session_state.get('graphs_key') != data_key:
+            all_graphs = load_all_graphs(data_path, data_stat.st_mtime)
+            if all_graphs is None:
+                st.stop()
+            st.session_state['graphs'] = all_graphs[analysis_rating]
+            st.session_state['graphs_key'] = data_key
+        G, G_trust, G_distrust = st.session_state['graphs']
+        rating_summary = summarize_ratings(data_path, analysis_rating, data_stat.st_mtime)
+        pct_positive = rating_summary['pct_positive']
     
     # Compute analytics
     with st.spinner("🧮 Computing analytics..."):
-        pagerank_scores = centrality.compute_pagerank(G_trust)
-        partition, community_sizes = community.detect_communities(G_trust)
-        comp_stats = components.analyze_components(G)
-        connectivity = components.analyze_component_connectivity(G)
-        suspicious = community.find_suspicious_communities(G_trust, partition, community_sizes, max_size=10)
+        (pagerank_scores, top_pagerank, partition, community_sizes,
+         comp_stats, connectivity, suspicious) = run_analytics(data_key, G, G_trust, use_gpu)
     
     st.markdown("<h1 style='text-align: center;'>🔐 Bitcoin OTC Trust Network Analysis</h1>", unsafe_allow_html=True)
     st.markdown("---")
@@ -343,8 +515,7 @@ if run_analysis or 'data_loaded' in st.session_state:
             with cols[1]:
                 st.metric("Ratings", f"{G.number_of_edges():,}", "Trust edges")
             with cols[2]:
-                pct_pos = (df['rating'] > 0).sum() / len(df) * 100
-                st.metric("Trust %", f"{pct_pos:.1f}%", "Positive ratings")
+                st.metric("Trust %", f"{pct_positive:.1f}%", "Positive ratings")
         
         with col2:
             st.info("""
@@ -431,11 +602,11 @@ if run_analysis or 'data_loaded' in st.session_state:
         with col1:
             st.metric("Total Ratings", f"{len(df):,}")
         with col2:
-            st.metric("Unique Users", f"{len(set(df['source']) | set(df['target'])):,}")
+            st.metric("Unique Users", f"{rating_summary['num_users']:,}")
         with col3:
-            st.metric("Positive", f"{(df['rating'] > 0).sum():,}")
+            st.metric("Positive", f"{rating_summary['num_positive']:,}")
         with col4:
-            st.metric("Negative", f"{(df['rating'] < 0).sum():,}")
+            st.metric("Negative", f"{rating_summary['num_negative']:,}")
     
     # ========================================================================
     # TAB 3: METRICS
@@ -451,7 +622,6 @@ if run_analysis or 'data_loaded' in st.session_state:
         with col2:
             st.metric("Total Edges", f"{G.number_of_edges():,}", "Ratings")
         with col3:
-            pct_positive = (df['rating'] > 0).sum() / len(df) * 100
             st.metric("Positive %", f"{pct_positive:.1f}%", "Trust-dominated")
         
         st.markdown("---")
@@ -489,9 +659,11 @@ if run_analysis or 'data_loaded' in st.session_state:
             """)
         
         # Leaderboard
-        top_pr = centrality.get_top_nodes(pagerank_scores, n=20)
+        top_pr = top_pagerank[:20]
+        # One in-degree pass over the leaderboard users instead of a degree view per row
+        in_degree = dict(G_trust.in_degree(u for u, _ in top_pr))
         pr_df = pd.DataFrame([
-            (i+1, u, f"{s:.6f}", G_trust.in_degree(u)) 
+            (i+1, u, f"{s:.6f}", in_degree[u]) 
             for i, (u, s) in enumerate(top_pr)
         ], columns=['Rank', 'User ID', 'PageRank Score', 'In-Degree'])
         
@@ -616,7 +788,7 @@ if run_analysis or 'data_loaded' in st.session_state:
             **Business Use**: Pre-transaction risk assessment.
             """)
         
-        trust_users = sorted(list(G_trust.nodes()))[:200]  # Limit for dropdown performance
+        trust_users = nsmallest(200, G_trust)  # Limit for dropdown performance; no full sort
         
         col1, col2, col3 = st.columns([1, 1, 1])
         with col1:
@@ -761,7 +933,7 @@ if run_analysis or 'data_loaded' in st.session_state:
             **Business Value**: Measure impact of onboarding high-trust users.
             """)
         
-        top_anchors = [u for u, _ in centrality.get_top_nodes(pagerank_scores, n=5)]
+        top_anchors = [u for u, _ in top_pagerank[:5]]
         
         st.markdown("### Trust Radius of Top Anchors")
         
@@ -825,11 +997,11 @@ if run_analysis or 'data_loaded' in st.session_state:
         if viz_type == "Interactive Full Network (PyVis)":
             st.markdown("### Interactive Network (Top Nodes by PageRank)")
 
-            num_nodes_viz = st.slider("Number of nodes to visualize", 30, 100, 60, key='num_nodes_viz')
+            num_nodes_viz = st.slider("Number of nodes to visualize", 30, TOP_PAGERANK_N, 60, key='num_nodes_viz')
 
             if st.button("🎨 Generate Interactive Graph", key='gen_pyvis'):
                 with st.spinner("Creating visualization..."):
-                    top_nodes = [u for u, _ in centrality.get_top_nodes(pagerank_scores, n=num_nodes_viz)]
+                    top_nodes = [u for u, _ in top_pagerank[:num_nodes_viz]]
                     html = visualization.create_pyvis_interactive(
                         G_trust, top_nodes, pagerank_scores, partition
                     )
@@ -850,13 +1022,13 @@ if run_analysis or 'data_loaded' in st.session_state:
             
             if st.button("🎨 Generate PNG", key='gen_png'):
                 with st.spinner("Creating PNG..."):
-                    png_path = visualization.create_network_png(
-                        G_trust, pagerank_scores, partition,
-                        output_path='network_visualization.png',
-                        sample_size=300
-                    )
-                    st.success(f"✅ Saved to: {png_path}")
-                    st.info("PNG file created in project directory. Use for presentations.")
+                    # Rendered in memory and cached, so repeat clicks skip matplotlib
+                    png_bytes = render_network_png(data_key, G_trust, pagerank_scores,
+                                                   partition, use_gpu, sample_size=300)
+                    st.image(png_bytes, use_container_width=True)
+                    st.download_button("⬇️ Download PNG", png_bytes, file_name='network_visualization.png',
+                                       mime='image/png', key='download_png')
+                    st.info("Use the download button to save the PNG for presentations.")
     
     # ========================================================================
     # TAB 10: RECOMMENDATIONS
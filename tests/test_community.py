@@ -0,0 +1,71 @@
+"""
+Tests for the community detection backends.
+"""
+
+import unittest
+from collections import defaultdict
+
+import networkx as nx
+from networkx.algorithms.community import louvain_communities, modularity
+
+from analysis import community
+
+
+def _groups(partition):
+    members = defaultdict(set)
+    for node, comm_id in partition.items():
+        members[comm_id].add(node)
+    return sorted(members.values(), key=min)
+
+
+@unittest.skipUnless(community.NUMBA_AVAILABLE, "Numba is not installed")
+class TestNumbaLouvain(unittest.TestCase):
+
+    def test_two_cliques_joined_by_one_edge(self):
+        G = nx.barbell_graph(5, 0)
+        partition = community._numba_louvain(G)
+        self.assertEqual(_groups(partition), [set(range(5)), set(range(5, 10))])
+
+    def test_directed_input_matches_undirected(self):
+        G = nx.barbell_graph(5, 0)
+        self.assertEqual(community._numba_louvain(G.to_directed()), community._numba_louvain(G))
+
+    def test_modularity_close_to_networkx(self):
+        for G in (nx.karate_club_graph(), nx.les_miserables_graph()):
+            ours = modularity(G, _groups(community._numba_louvain(G)), weight='weight')
+            reference = modularity(G, louvain_communities(G, weight='weight', seed=42), weight='weight')
+            self.assertGreaterEqual(ours, reference - 0.02)
+
+    def test_edgeless_graph_gives_singletons(self):
+        G = nx.empty_graph(3)
+        self.assertEqual(community._numba_louvain(G), {0: 0, 1: 1, 2: 2})
+
+
+@unittest.skipUnless(community.LEIDEN_AVAILABLE, "leidenalg is not installed")
+class TestLeidenUpdate(unittest.TestCase):
+
+    def test_known_nodes_keep_their_community(self):
+        G = nx.path_graph(5)
+        previous = {0: 0, 1: 1, 2: 2, 100: 3, 101: 4, 102: 5}
+        partition = community._leiden_update(G, previous)
+        self.assertEqual(set(partition), set(G))
+        for node in (0, 1, 2):
+            self.assertEqual(partition[node], previous[node])
+
+    def test_new_communities_do_not_reuse_vanished_ids(self):
+        G = nx.barbell_graph(5, 0)
+        previous = {node: 7 for node in range(5)}
+        previous[100] = 9
+        partition = community._leiden_update(G, previous)
+        self.assertEqual({partition[node] for node in range(5)}, {7})
+        self.assertTrue(all(partition[node] > 9 for node in range(5, 10)))
+
+    def test_integer_weights(self):
+        G = nx.barbell_graph(5, 0)
+        nx.set_edge_attributes(G, 2, 'weight')
+        partition = community._leiden_update(G, {0: 0, 9: 1})
+        self.assertEqual(_groups(partition), [set(range(5)), set(range(5, 10))])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Tests for the shared CSR adjacency and its optional cuGraph copy.
+"""
+
+import unittest
+
+import networkx as nx
+
+from analysis import centrality, csr
+
+
+def _small_trust_graph():
+    G = nx.DiGraph()
+    G.add_edge(1, 2, weight=3)
+    G.add_edge(2, 1, weight=5)
+    G.add_edge(2, 3, weight=1)
+    G.add_edge(3, 4, weight=2)
+    return G
+
+
+class TestGpuFallback(unittest.TestCase):
+
+    def test_pagerank_use_gpu_matches_cpu_without_cugraph(self):
+        if csr.CUGRAPH_AVAILABLE:
+            self.skipTest("cuGraph installed; the GPU path is exercised instead")
+        G = _small_trust_graph()
+        self.assertEqual(centrality.compute_pagerank(G, use_gpu=True), centrality.compute_pagerank(G))
+
+
+@unittest.skipUnless(csr.CUGRAPH_AVAILABLE, "cuGraph (RAPIDS) is not installed")
+class TestCugraphView(unittest.TestCase):
+
+    def test_directed_view_keeps_every_edge(self):
+        G = _small_trust_graph()
+        G_gpu, nodes = csr.cugraph_view(G, weight='weight')
+        self.assertEqual(nodes, list(G))
+        self.assertEqual(G_gpu.number_of_edges(), G.number_of_edges())
+
+    def test_undirected_view_collapses_reciprocal_pairs(self):
+        G = _small_trust_graph()
+        G_gpu, nodes = csr.cugraph_view(G, weight='weight', directed=False)
+        edges = G_gpu.view_edge_list().to_pandas()
+        self.assertEqual(len(edges), 3)
+        i, j = nodes.index(1), nodes.index(2)
+        pair = edges[((edges['src'] == i) & (edges['dst'] == j)) | ((edges['src'] == j) & (edges['dst'] == i))]
+        self.assertEqual(pair['weight'].tolist(), [5.0])
+
+    def test_pagerank_matches_cpu(self):
+        G = _small_trust_graph()
+        gpu = centrality.compute_pagerank(G, use_gpu=True)
+        cpu = centrality.compute_pagerank(G)
+        for node, score in cpu.items():
+            self.assertAlmostEqual(gpu[node], score, places=4)
+
+
+if __name__ == '__main__':
+    unittest.main()